@@ -5,57 +5,137 @@ Analyzes the structure of your catalog Excel files to help with enrichment setup
 """
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
 
-def analyze_excel_file(file_path: str) -> dict:
+# Prefer the Rust-backed calamine reader; fall back to openpyxl when the wheel isn't installed
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+
+# Files larger than this are profiled row-by-row instead of being loaded into a DataFrame
+STREAMING_THRESHOLD_MB = 25
+# Rows read up front to get column names and dtypes without parsing the whole sheet
+SAMPLE_ROWS = 200
+
+
+class ColumnStat(NamedTuple):
+    name: str
+    dtype: str
+    sample: Optional[str]
+    missing: int
+    missing_percentage: float
+    unique: int
+    unique_percentage: float
+
+
+def _stream_column_stats(file_path: str, engine: str) -> dict:
+    """Count rows, missing and unique values per column straight from calamine rows."""
+    from python_calamine import CalamineWorkbook
+
+    # Probe the first rows for column names and dtypes
+    head_df = pd.read_excel(file_path, sheet_name=0, nrows=SAMPLE_ROWS, engine=engine)
+    columns = list(head_df.columns)
+    column_count = len(columns)
+
+    sheet = CalamineWorkbook.from_path(file_path).get_sheet_by_index(0)
+    # calamine rows start at the first used column; pandas keeps the empty leading columns
+    offset = sheet.start[1] if sheet.start else 0
+    rows = sheet.iter_rows()
+    next(rows, None)  # header row
+
+    missing = [0] * column_count
+    uniques = [set() for _ in range(column_count)]
+    samples = [None] * column_count
+    total_rows = 0
+    for row in rows:
+        total_rows += 1
+        for i, value in enumerate(row[:column_count - offset], start=offset):
+            if value == "" or value is None:
+                missing[i] += 1
+            else:
+                uniques[i].add(value)
+                if samples[i] is None:
+                    samples[i] = value
+    for i in range(offset):
+        missing[i] = total_rows
+
+    return {
+        "total_rows": total_rows,
+        "columns": columns,
+        "dtypes": [str(dtype) for dtype in head_df.dtypes],
+        "samples": samples,
+        "missing": missing,
+        "unique": [len(u) for u in uniques]
+    }
+
+
+def _pandas_column_stats(file_path: str, engine: str) -> dict:
+    """Compute column statistics with pandas, one vectorized call per statistic."""
+    df = pd.read_excel(file_path, sheet_name=0, engine=engine)
+    total_rows = len(df)
+    samples = df.bfill().iloc[0] if total_rows else pd.Series(None, index=df.columns, dtype=object)
+
+    return {
+        "total_rows": total_rows,
+        "columns": list(df.columns),
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+        "samples": [value if pd.notna(value) else None for value in samples],
+        "missing": [int(count) for count in df.isna().sum()],
+        "unique": [int(count) for count in df.nunique(dropna=True)]
+    }
+
+
+def analyze_excel_file(file_path: str, engine: Optional[str] = None) -> dict:
     """Analyze an Excel file and return its structure information."""
+    engine = engine or EXCEL_ENGINE
     try:
-        # Read the Excel file
-        df = pd.read_excel(file_path, sheet_name=0)
+        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        
+        if engine == "calamine" and file_size_mb > STREAMING_THRESHOLD_MB:
+            # Large workbook: accumulate counters row-by-row instead of materializing every cell
+            stats = _stream_column_stats(file_path, engine)
+        else:
+            stats = _pandas_column_stats(file_path, engine)
         
-        analysis = {
+        # Per-column statistics stay as the parallel lists the profilers produced;
+        # iter_column_stats expands them one column at a time when reporting
+        return {
             "file_name": os.path.basename(file_path),
-            "file_size_mb": round(os.path.getsize(file_path) / (1024 * 1024), 2),
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "columns": list(df.columns),
-            "sample_data": {},
-            "data_types": {},
-            "missing_values": {},
-            "unique_values": {}
+            "file_size_mb": round(file_size_mb, 2),
+            "total_rows": stats["total_rows"],
+            "total_columns": len(stats["columns"]),
+            "stats": stats
         }
         
-        # Analyze each column
-        for column in df.columns:
-            # Sample data (first non-null value)
-            sample_value = df[column].dropna().iloc[0] if not df[column].dropna().empty else None
-            analysis["sample_data"][column] = str(sample_value)[:100] if sample_value else None
-            
-            # Data types
-            analysis["data_types"][column] = str(df[column].dtype)
-            
-            # Missing values
-            missing_count = df[column].isna().sum()
-            analysis["missing_values"][column] = {
-                "count": int(missing_count),
-                "percentage": round((missing_count / len(df)) * 100, 2)
-            }
-            
-            # Unique values (for categorical columns)
-            unique_count = df[column].nunique()
-            analysis["unique_values"][column] = {
-                "count": int(unique_count),
-                "percentage": round((unique_count / len(df)) * 100, 2)
-            }
-        
-        return analysis
-        
     except Exception as e:
         return {
             "file_name": os.path.basename(file_path),
             "error": str(e)
         }
 
+def iter_column_stats(analysis: dict) -> Iterator[ColumnStat]:
+    """Yield the statistics of an analyzed file one column at a time."""
+    stats = analysis["stats"]
+    total_rows = stats["total_rows"]
+    for name, dtype, sample, missing, unique in zip(
+        stats["columns"], stats["dtypes"], stats["samples"], stats["missing"], stats["unique"]
+    ):
+        yield ColumnStat(
+            name=name,
+            dtype=dtype,
+            sample=str(sample)[:100] if sample else None,
+            missing=missing,
+            missing_percentage=round((missing / total_rows) * 100, 2) if total_rows else 0.0,
+            unique=unique,
+            unique_percentage=round((unique / total_rows) * 100, 2) if total_rows else 0.0
+        )
+
+
 def main():
     """Main analysis function."""
     print("🔍 Catalog File Analysis")
@@ -78,36 +158,40 @@ def main():
     print(f"📁 Found {len(excel_files)} Excel files to analyze:")
     print()
     
-    for file_path in excel_files:
-        print(f"📊 Analyzing: {file_path.name}")
-        print("-" * 40)
+    # Each workbook is parsed independently, so spread them across processes
+    with ProcessPoolExecutor(max_workers=min(len(excel_files), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(analyze_excel_file, str(file_path)): file_path for file_path in excel_files}
         
-        analysis = analyze_excel_file(str(file_path))
-        
-        if "error" in analysis:
-            print(f"❌ Error: {analysis['error']}")
+        for future in as_completed(futures):
+            file_path = futures[future]
+            print(f"📊 Analyzing: {file_path.name}")
+            print("-" * 40)
+            
+            analysis = future.result()
+            
+            if "error" in analysis:
+                print(f"❌ Error: {analysis['error']}")
+                print()
+                continue
+            
+            print(f"📏 File Size: {analysis['file_size_mb']} MB")
+            print(f"📊 Total Rows: {analysis['total_rows']:,}")
+            print(f"📋 Total Columns: {analysis['total_columns']}")
             print()
-            continue
-        
-        print(f"📏 File Size: {analysis['file_size_mb']} MB")
-        print(f"📊 Total Rows: {analysis['total_rows']:,}")
-        print(f"📋 Total Columns: {analysis['total_columns']}")
-        print()
-        
-        print("📋 Column Analysis:")
-        for column in analysis["columns"]:
-            print(f"  • {column}")
-            print(f"    - Type: {analysis['data_types'][column]}")
-            print(f"    - Missing: {analysis['missing_values'][column]['count']} ({analysis['missing_values'][column]['percentage']}%)")
-            print(f"    - Unique: {analysis['unique_values'][column]['count']} ({analysis['unique_values'][column]['percentage']}%)")
             
-            sample = analysis['sample_data'][column]
-            if sample:
-                print(f"    - Sample: {sample}")
+            print("📋 Column Analysis:")
+            for column in iter_column_stats(analysis):
+                print(f"  • {column.name}")
+                print(f"    - Type: {column.dtype}")
+                print(f"    - Missing: {column.missing} ({column.missing_percentage}%)")
+                print(f"    - Unique: {column.unique} ({column.unique_percentage}%)")
+                
+                if column.sample:
+                    print(f"    - Sample: {column.sample}")
+                print()
+            
+            print("=" * 50)
             print()
-        
-        print("=" * 50)
-        print()
     
     print("💡 Recommendations for Enrichment:")
     print("1. Identify key fields for product identification (name, SKU, UPC)")
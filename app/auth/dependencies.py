@@ -1,16 +1,27 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from ..auth.jwt import verify_token
-from ..database import get_database
+from ..auth.jwt import verify_token_sub
+from ..database import Database
 from ..models.user import User
 from bson import ObjectId
+from bson.errors import InvalidId
+from functools import lru_cache
+from typing import Optional
 
 security = HTTPBearer()
 
 
+@lru_cache(maxsize=4096)
+def _user_oid(user_id: str) -> Optional[ObjectId]:
+    """Parse a token subject into an ObjectId; active users hit the cache on every request."""
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        return None
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db = Depends(get_database)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
     """Get current authenticated user from JWT token."""
     credentials_exception = HTTPException(
@@ -19,19 +30,12 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-            
-    except Exception:
+    user_id = verify_token_sub(credentials.credentials)
+    user_oid = _user_oid(user_id) if isinstance(user_id, str) else None
+    if user_oid is None:
         raise credentials_exception
     
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await Database.users.find_one({"_id": user_oid})
     if user is None:
         raise credentials_exception
     
@@ -1,31 +1,70 @@
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
 from ..config import settings
 
 # Support both argon2 and bcrypt for transition period
 # argon2 is preferred, bcrypt is deprecated but still supported for existing users
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated=["bcrypt"])
+# Argon2 cost is pinned explicitly (46 MiB, 2 iterations, 1 lane) so login latency doesn't
+# drift with library defaults; hashing runs in a worker thread, off the event loop
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 47104
+ARGON2_PARALLELISM = 1
+
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM
+)
+
+# Direct argon2 hasher with the same parameters, bypassing passlib's scheme dispatch
+# on the hot path; passlib is only consulted for legacy bcrypt hashes
+_ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM
+)
+
+# Hash prefixes we know how to verify; anything else is rejected without hashing
+_KNOWN_HASH_PREFIXES = ("$argon2", "$2")
+_BCRYPT_PREFIXES = ("$2b$", "$2a$")
+
+# Accepted signing algorithms, built once instead of per verify_token call
+_ALGS = [settings.jwt_algorithm]
+_DEFAULT_EXP_SECONDS = settings.jwt_expiration_minutes * 60
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
+    if not hashed_password or not hashed_password.startswith(_KNOWN_HASH_PREFIXES):
+        return False
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _ph.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def verify_and_upgrade_password(plain_password: str, hashed_password: str) -> tuple[bool, str]:
     """
     Verify a password and return (is_valid, new_hash).
-    If the password is valid and uses bcrypt, returns a new argon2 hash.
-    If the password is valid and uses argon2, returns the same hash.
+    If the password is valid and uses bcrypt or outdated argon2 parameters, returns a new argon2 hash.
+    If the password is valid and uses current argon2 parameters, returns the same hash.
     If the password is invalid, returns (False, "").
     """
-    if pwd_context.verify(plain_password, hashed_password):
-        # Check if the hash is using bcrypt (deprecated)
-        if hashed_password.startswith('$2b$') or hashed_password.startswith('$2a$'):
+    if verify_password(plain_password, hashed_password):
+        # Rehash bcrypt (deprecated) and argon2 hashes made with older cost parameters
+        if hashed_password[:4] in _BCRYPT_PREFIXES or _ph.check_needs_rehash(hashed_password):
             # Generate new argon2 hash for future use
-            new_hash = pwd_context.hash(plain_password)
+            new_hash = _ph.hash(plain_password)
             return True, new_hash
         else:
             # Already using argon2, return the same hash
@@ -36,27 +75,36 @@ def verify_and_upgrade_password(plain_password: str, hashed_password: str) -> tu
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return _ph.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expiration_minutes)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
-    return encoded_jwt
+    expires_in = int(expires_delta.total_seconds()) if expires_delta else _DEFAULT_EXP_SECONDS
+    # JWT accepts seconds since epoch, so skip building a datetime just to have it converted back
+    to_encode = {**data, "exp": int(time.time()) + expires_in}
+    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify JWT token and return payload."""
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=_ALGS)
         return payload
     except JWTError:
         return None
 
+
+
+def verify_token_sub(token: str) -> Optional[str]:
+    """Verify JWT token and return only its subject (user id)."""
+    try:
+        payload = jwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=_ALGS,
+            options={"require": ["exp", "sub"]},
+        )
+    except JWTError:
+        return None
+    return payload["sub"]
@@ -1,48 +1,56 @@
+import logging
 import os
 from dotenv import load_dotenv
+from functools import lru_cache
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
 
 def parse_env_file():
     """Parse ENV_FILE_DEV environment variable if it exists (for ECS single secret approach)."""
+    content = os.environ.get('ENV_FILE_DEV')
     # Only run this in ECS/production environments, not locally
-    if os.environ.get('ENV_FILE_DEV') and not os.path.exists('.env'):
-        print(f"🔍 Found ENV_FILE_DEV: {os.environ.get('ENV_FILE_DEV')[:100]}...")  # Debug log
-        # Parse the ENV_FILE_DEV content (key=value format)
-        for line in os.environ.get('ENV_FILE_DEV', '').strip().split('\n'):
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                # Set the environment variable if it's not already set
-                if key and value and key not in os.environ:
-                    os.environ[key] = value
-                    print(f"✅ Set {key}={value[:20]}...")  # Debug log
-                elif key and value:
-                    print(f"⚠️  {key} already set, skipping")  # Debug log
-    else:
-        if os.path.exists('.env'):
-            print("📁 Local development: Using .env file")  # Debug log
-        else:
-            print("❌ No ENV_FILE_DEV or .env file found")  # Debug log
+    if not content or os.path.exists('.env'):
+        return
+    
+    # Parse the ENV_FILE_DEV content (key=value format)
+    env_vars = {}
+    for line in content.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#') and '=' in line:
+            key, value = line.split('=', 1)
+            env_vars[key.strip()] = value.strip()
+    
+    # Set the environment variables that aren't already set
+    os.environ.update({
+        key: value for key, value in env_vars.items()
+        if key and value and key not in os.environ
+    })
 
 
 # Parse ENV_FILE_DEV at module import time (only in ECS)
 parse_env_file()
 
-# Debug: Show what environment variables we have
-print(f"🔍 Environment variables after parsing:")
-print(f"   MONGODB_URL: {os.environ.get('MONGODB_URL', 'NOT SET')}")
-print(f"   JWT_SECRET_KEY: {os.environ.get('JWT_SECRET_KEY', 'NOT SET')[:10] if os.environ.get('JWT_SECRET_KEY') else 'NOT SET'}...")
+if logger.isEnabledFor(logging.DEBUG):
+    logger.debug(
+        "env loaded: MONGODB_URL=%s JWT_SECRET_KEY=%s",
+        bool(os.environ.get("MONGODB_URL")),
+        bool(os.environ.get("JWT_SECRET_KEY"))
+    )
 
 
 class Settings:
     # Database Configuration
     mongodb_url: str = os.environ.get("MONGODB_URL")  # No fallback - must be set
+    mongodb_max_pool_size: int = int(os.environ.get("MONGODB_MAX_POOL_SIZE", "200"))
+    mongodb_min_pool_size: int = int(os.environ.get("MONGODB_MIN_POOL_SIZE", "20"))
+    
+    # Cache Configuration (response caching is disabled when unset)
+    redis_url: Optional[str] = os.environ.get("REDIS_URL")
     
     # AWS Configuration
     aws_access_key_id: Optional[str] = os.environ.get("AWS_ACCESS_KEY_ID")
@@ -60,6 +68,8 @@ class Settings:
     api_host: str = os.environ.get("API_HOST", "0.0.0.0")
     api_port: int = int(os.environ.get("API_PORT", "8000"))
     debug: bool = os.environ.get("DEBUG", "True").lower() == "true"
+    # Uploads up to this size stay in memory instead of spilling to a temp file
+    upload_spool_max_mb: int = int(os.environ.get("UPLOAD_SPOOL_MAX_MB", "50"))
     
     # External APIs
     amazon_api_key: Optional[str] = os.environ.get("AMAZON_API_KEY")
@@ -67,4 +77,10 @@ class Settings:
     keepa_api_key: Optional[str] = os.environ.get("KEEPA_API_KEY")  # No fallback - must be set
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built on first use."""
+    return Settings()
+
+
+settings = get_settings()
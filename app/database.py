@@ -1,52 +1,93 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
+from urllib.parse import urlsplit
 from .config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Database:
-    client: AsyncIOMotorClient = None
+    client: AsyncMongoClient = None
     db = None
+    # pymongo builds a new Collection object on every db.<name> access, so the collection
+    # hit on every authenticated request is bound once at connect time
+    users = None
+
+
+# Module-level handle so get_database() is a plain global read on every request
+_db = None
 
 
 async def connect_to_mongo():
     """Create database connection."""
+    global _db
     try:
         logger.info(f"Attempting to connect to MongoDB at: {settings.mongodb_url}")
-        Database.client = AsyncIOMotorClient(settings.mongodb_url)
+        # PyMongo's native asyncio client; Motor delegated every operation to a thread pool
+        Database.client = AsyncMongoClient(
+            settings.mongodb_url,
+            maxPoolSize=settings.mongodb_max_pool_size,
+            minPoolSize=settings.mongodb_min_pool_size,
+            # Recycle connections idle for 30s; fail fast instead of queueing forever when the pool is exhausted
+            maxIdleTimeMS=30000,
+            waitQueueTimeoutMS=2000,
+            serverSelectionTimeoutMS=3000,
+            compressors="zstd,snappy,zlib",
+            uuidRepresentation="standard",
+            retryWrites=True
+        )
         
         # Test the connection
         await Database.client.admin.command('ping')
         logger.info("MongoDB connection test successful")
         
-        # Extract database name from URL or use default
-        if "/" in settings.mongodb_url:
-            # Split by "/" and get the last part, then remove query parameters
-            db_part = settings.mongodb_url.split("/")[-1]
-            # Remove query parameters (everything after "?")
-            if "?" in db_part:
-                db_name = db_part.split("?")[0]
-            else:
-                db_name = db_part
-        else:
-            db_name = "perfect_po_db"
+        # Extract database name from the URL path or use default
+        db_name = urlsplit(settings.mongodb_url).path.lstrip("/") or "perfect_po_db"
         
-        Database.db = Database.client[db_name]
+        Database.db = _db = Database.client[db_name]
+        Database.users = _db.users
         logger.info(f"Connected to MongoDB database: {Database.db.name}")
         
+        await create_indexes(_db)
+        
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {str(e)}")
-        logger.error(f"Connection error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Connection traceback: {traceback.format_exc()}")
+        logger.exception(f"Failed to connect to MongoDB: {type(e).__name__}: {e}")
         raise
 
 
+async def create_indexes(db):
+    """Create the indexes the API relies on; existing indexes are left as-is."""
+    indexes = [
+        # Registration relies on these to reject duplicate accounts server-side
+        (db.users, "email", {"unique": True}),
+        (db.users, "username", {"unique": True}),
+        # Catalog listings filter by owner (and optionally status) and return newest first
+        (db.catalogs, [("user_id", 1), ("created_at", -1)], {}),
+        (db.catalogs, [("user_id", 1), ("status", 1), ("created_at", -1)], {}),
+        # Backs the per-catalog enrichment status breakdown in the catalog summary
+        (db.products, [("catalog_id", 1), ("user_id", 1), ("enrichment_status", 1)], {}),
+        # Backs the per-type offer breakdown in the catalog offers summary
+        (db.offers, [("user_id", 1), ("catalog_id", 1), ("offer_type", 1)], {}),
+        # Let the _id-ordered product/offer listings (and their `after` cursor) walk an index
+        (db.products, [("user_id", 1), ("_id", 1)], {}),
+        (db.offers, [("user_id", 1), ("_id", 1)], {}),
+    ]
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except OperationFailure as e:
+            logger.error(f"Failed to create index {keys} on {collection.name}: {e}")
+            # Without the unique indexes duplicate accounts would be accepted, so refuse to start
+            if options.get("unique"):
+                raise
+            # The others only speed up queries; the API still works without them
+
+
 async def close_mongo_connection():
     """Close database connection."""
     if Database.client is not None:
         logger.info("Closing MongoDB connection...")
-        Database.client.close()
+        await Database.client.close()
         logger.info("MongoDB connection closed successfully.")
     else:
         logger.info("No MongoDB connection to close.")
@@ -54,7 +95,7 @@ async def close_mongo_connection():
 
 def get_database():
     """Get database instance."""
-    if Database.db is None:
+    if _db is None:
         logger.error("Database connection not established. Call connect_to_mongo() first.")
         raise RuntimeError("Database connection not established")
-    return Database.db
+    return _db
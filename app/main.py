@@ -1,29 +1,54 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
 from .database import connect_to_mongo, close_mongo_connection
 from .routers import auth, catalogs, enrichment, products, offers
 from .config import settings
+from .responses import NEXT_CURSOR_HEADER, ORJSONResponse
 from app.services.catalog_service import CatalogService
+from app.services.cache_service import cache_service
+from app.services.enrichment_service import local_enrichment_service
 
 # Configure logging
+# Request handlers only enqueue records; a background listener does the stream/file I/O
+log_queue = queue.SimpleQueue()
+log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+# Every uvicorn worker process appends to the same file, so rotation is left to an external
+# rotator (e.g. logrotate); WatchedFileHandler reopens app.log once it has been moved away
+file_handler = WatchedFileHandler("app.log")
+file_handler.setFormatter(log_formatter)
+log_listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+log_listener.start()
+
+# QueueHandler.prepare() bakes the formatted message into the record; keep it to the bare
+# message so the listener's formatter isn't applied on top of basicConfig's default format
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log")
-    ]
+    handlers=[queue_handler],
+    force=True
 )
 
+# Keep typical catalog uploads in memory; Starlette's 1 MB default spills them to /tmp
+# only for the upload handler to read them straight back
+MultiPartParser.max_file_size = settings.upload_spool_max_mb * 1024 * 1024
+
 # Create FastAPI app
 app = FastAPI(
     title="Perfect PO API",
     description="Catalog Management System with Enrichment and Offer Generation",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -33,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -51,14 +77,12 @@ async def startup_event():
         logging.info(f"Connecting to MongoDB at: {settings.mongodb_url}")
         await connect_to_mongo()
         logging.info("MongoDB connection established successfully")
+        await cache_service.connect()
         logging.info("Application started successfully")
         logging.info(f"API will be available at: http://{settings.api_host}:{settings.api_port}")
         logging.info(f"API Documentation available at: http://{settings.api_host}:{settings.api_port}/docs")
     except Exception as e:
-        logging.error(f"Failed to start application: {str(e)}")
-        logging.error(f"Startup error type: {type(e).__name__}")
-        import traceback
-        logging.error(f"Startup traceback: {traceback.format_exc()}")
+        logging.exception(f"Failed to start application: {type(e).__name__}: {e}")
         raise
 
 
@@ -66,7 +90,10 @@ async def startup_event():
 async def shutdown_event():
     """Close database connection on shutdown."""
     await close_mongo_connection()
+    await cache_service.close()
+    await local_enrichment_service.aclose()
     logging.info("Application shutdown successfully")
+    log_listener.stop()
 
 
 @app.get("/")
@@ -88,10 +115,7 @@ async def health_check():
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
-    logging.error(f"Unhandled exception in {request.method} {request.url}: {str(exc)}")
-    logging.error(f"Exception type: {type(exc).__name__}")
-    import traceback
-    logging.error(f"Full traceback: {traceback.format_exc()}")
+    logging.error(f"Unhandled exception in {request.method} {request.url}: {type(exc).__name__}: {exc}", exc_info=exc)
     
     return JSONResponse(
         status_code=500,
@@ -104,10 +128,15 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
+    # Reload only works with a single worker; otherwise fan out across cores
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=1 if settings.debug else os.cpu_count(),
+        loop="uvloop",
+        http="httptools"
     )
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from bson import ObjectId
-from .user import PyObjectId
+from .user import PyObjectId, TimestampedModel
 
 
 class CatalogBase(BaseModel):
@@ -15,7 +15,7 @@ class CatalogCreate(CatalogBase):
     pass
 
 
-class Catalog(CatalogBase):
+class Catalog(CatalogBase, TimestampedModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: PyObjectId
     file_path: str  # S3 path
@@ -24,16 +24,13 @@ class Catalog(CatalogBase):
     total_items: int = 0
     enriched_items: int = 0
     status: str = "uploaded"  # uploaded, processing, enriched, completed, error
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
     enrichment_started_at: Optional[datetime] = None
     enrichment_completed_at: Optional[datetime] = None
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
-        schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_schema_extra={
             "example": {
                 "name": "Electronics Catalog 2024",
                 "description": "Latest electronics products",
@@ -43,13 +40,14 @@ class Catalog(CatalogBase):
                 "status": "uploaded"
             }
         }
+    )
 
 
 class CatalogResponse(BaseModel):
     id: str
     name: str
-    description: Optional[str]
-    category: Optional[str]
+    description: Optional[str] = None
+    category: Optional[str] = None
     file_name: str
     file_size: int
     total_items: int
@@ -57,11 +55,8 @@ class CatalogResponse(BaseModel):
     status: str
     created_at: datetime
     updated_at: datetime
-    enrichment_started_at: Optional[datetime]
-    enrichment_completed_at: Optional[datetime]
-
-    class Config:
-        json_encoders = {ObjectId: str}
+    enrichment_started_at: Optional[datetime] = None
+    enrichment_completed_at: Optional[datetime] = None
 
 
 class CatalogUpdate(BaseModel):
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
-from .user import PyObjectId
+from .user import PyObjectId, TimestampedModel
 
 
 class OfferRule(BaseModel):
@@ -49,7 +49,7 @@ class OfferCreate(OfferBase):
     rules: List[OfferRule] = []
 
 
-class Offer(OfferBase):
+class Offer(OfferBase, TimestampedModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: PyObjectId
     items: List[OfferItem]
@@ -58,14 +58,11 @@ class Offer(OfferBase):
     total_savings: float = 0.0
     offer_score: Optional[float] = None  # AI-generated score
     generation_method: str = "rule_based"  # rule_based, ai_generated, hybrid
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
-        schema_extra = {
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_schema_extra={
             "example": {
                 "name": "Electronics Bundle Deal",
                 "description": "Special pricing on electronics bundle",
@@ -75,13 +72,14 @@ class Offer(OfferBase):
                 "offer_score": 8.5
             }
         }
+    )
 
 
 class OfferResponse(BaseModel):
     id: str
     catalog_id: str
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     offer_type: str
     valid_from: datetime
     valid_until: datetime
@@ -89,14 +87,11 @@ class OfferResponse(BaseModel):
     items: List[OfferItemResponse]  # Use OfferItemResponse instead of OfferItem
     total_discount: float
     total_savings: float
-    offer_score: Optional[float]
+    offer_score: Optional[float] = None
     generation_method: str
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        json_encoders = {ObjectId: str}
-
 
 class OfferUpdate(BaseModel):
     name: Optional[str] = None
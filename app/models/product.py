@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from bson import ObjectId
-from .user import PyObjectId
+from .user import PyObjectId, TimestampedModel
 
 
 class ProductBase(BaseModel):
@@ -27,7 +27,7 @@ class ProductCreate(ProductBase):
     pass
 
 
-class Product(ProductBase):
+class Product(ProductBase, TimestampedModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: PyObjectId
     original_data: Dict[str, Any] = {}  # Raw catalog data
@@ -35,15 +35,12 @@ class Product(ProductBase):
     enrichment_source: Optional[str] = None  # e.g., "amazon_api"
     enrichment_status: str = "pending"  # pending, processing, completed, failed
     enrichment_errors: List[str] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
     enriched_at: Optional[datetime] = None
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
-        schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_schema_extra={
             "example": {
                 "name": "Wireless Bluetooth Headphones",
                 "description": "High-quality wireless headphones with noise cancellation",
@@ -55,6 +52,7 @@ class Product(ProductBase):
                 "enrichment_status": "completed"
             }
         }
+    )
 
 
 class ProductResponse(BaseModel):
@@ -62,25 +60,22 @@ class ProductResponse(BaseModel):
     catalog_id: str
     line_item_id: str
     name: str
-    description: Optional[str]
-    category: Optional[str]
-    brand: Optional[str]
-    sku: Optional[str]
-    upc: Optional[str]
-    price: Optional[float]
+    description: Optional[str] = None
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    sku: Optional[str] = None
+    upc: Optional[str] = None
+    price: Optional[float] = None
     currency: str
-    quantity: Optional[int]
-    unit: Optional[str]
-    main_image: Optional[str]  # Primary product image URL
-    images: Optional[List[str]]  # Additional product images
+    quantity: Optional[int] = None
+    unit: Optional[str] = None
+    main_image: Optional[str] = None  # Primary product image URL
+    images: Optional[List[str]] = None  # Additional product images
     enrichment_status: str
-    enriched_at: Optional[datetime]
+    enriched_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        json_encoders = {ObjectId: str}
-
 
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
@@ -1,13 +1,20 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic_core import core_schema
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
 
 
 class PyObjectId(ObjectId):
+    __slots__ = ()
+
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        # Keep ObjectId in Python dumps (Mongo writes), render as str in JSON
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
 
     @classmethod
     def validate(cls, v):
@@ -16,8 +23,8 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __get_pydantic_json_schema__(cls, field_schema, field):
-        field_schema.update(type="string", format="string")
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return {"type": "string", "format": "string"}
         
     def __repr__(self):
         return f"PyObjectId('{super().__repr__()}')"
@@ -29,6 +36,23 @@ class PyObjectId(ObjectId):
         return hash(super().__hash__())
 
 
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TimestampedModel(BaseModel):
+    """Base for stored documents; created_at and updated_at share one clock read."""
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
+
+    def __init__(self, **data):
+        if "created_at" not in data or "updated_at" not in data:
+            now = _now()
+            data.setdefault("created_at", now)
+            data.setdefault("updated_at", now)
+        super().__init__(**data)
+
+
 class UserBase(BaseModel):
     email: EmailStr
     username: str = Field(..., min_length=3, max_length=50)
@@ -44,18 +68,15 @@ class UserLogin(BaseModel):
     password: str
 
 
-class User(UserBase):
+class User(UserBase, TimestampedModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     hashed_password: str
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
-        schema_extra = {
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_schema_extra={
             "example": {
                 "email": "user@example.com",
                 "username": "johndoe",
@@ -63,6 +84,7 @@ class User(UserBase):
                 "is_active": True
             }
         }
+    )
 
 
 class UserResponse(BaseModel):
@@ -73,6 +95,3 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
     updated_at: datetime
-
-    class Config:
-        json_encoders = {ObjectId: str}
@@ -0,0 +1,49 @@
+from typing import Any
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from pydantic import BaseModel
+import orjson
+
+# Set on list responses when another page may follow; pass it back as `after`
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize types orjson doesn't know natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        # model_dump runs in pydantic-core without validation; orjson encodes the result
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _render(content: Any) -> bytes:
+    return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """orjson-rendered response that also serializes ObjectId values as strings."""
+
+    def render(self, content: Any) -> bytes:
+        return _render(content)
+
+
+class PydanticResponse(ORJSONResponse):
+    """Response for bodies built from (constructed) Pydantic models, skipping FastAPI's
+    jsonable_encoder and response_model validation."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            # Already rendered by create()
+            return content
+        return _render(content)
+
+    @classmethod
+    async def create(cls, content: Any, status_code: int = 200) -> "PydanticResponse":
+        """Render in a worker thread so large list bodies don't block the event loop."""
+        body = await run_in_threadpool(_render, content)
+        return cls(content=body, status_code=status_code)
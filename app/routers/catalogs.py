@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
 from typing import List, Optional
 from ..auth.dependencies import get_current_active_user
 from ..models.user import User
-from ..models.catalog import CatalogResponse, CatalogCreate, CatalogUpdate
+from ..models.catalog import Catalog, CatalogResponse, CatalogCreate, CatalogUpdate
 from ..services.catalog_service import catalog_service
 from ..services.aws_service import aws_service
 from ..services.enrichment_service import local_enrichment_service
+from ..services.cache_service import cache_service
 from ..database import get_database
+from ..responses import ORJSONResponse
 from bson import ObjectId
 from datetime import datetime
 import logging
@@ -15,6 +17,35 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/catalogs", tags=["catalogs"])
 
+ALLOWED_UPLOAD_EXTENSIONS = frozenset({"xlsx", "xls", "csv"})
+
+# Short TTL: the UI polls single catalogs, and enrichment updates status in the background
+CATALOG_CACHE_SECONDS = 30
+
+
+def _catalog_cache_key(user_id: str, catalog_id: str) -> str:
+    """Cache key scoped to the owning user so responses never leak across accounts."""
+    return f"catalog:{user_id}:{catalog_id}"
+
+
+def _catalog_to_dict(catalog: Catalog) -> dict:
+    """Build the CatalogResponse payload straight from a trusted Catalog."""
+    return {
+        "id": str(catalog.id),
+        "name": catalog.name,
+        "description": catalog.description,
+        "category": catalog.category,
+        "file_name": catalog.file_name,
+        "file_size": catalog.file_size,
+        "total_items": catalog.total_items,
+        "enriched_items": catalog.enriched_items,
+        "status": catalog.status,
+        "created_at": catalog.created_at,
+        "updated_at": catalog.updated_at,
+        "enrichment_started_at": catalog.enrichment_started_at,
+        "enrichment_completed_at": catalog.enrichment_completed_at
+    }
+
 
 # This endpoint is removed since we have the upload endpoint that handles file uploads
 # If you need a simple catalog creation without file upload, you can uncomment and modify this
@@ -29,12 +60,8 @@ async def upload_catalog_file(
 ):
     """Upload a catalog file and create catalog."""
     try:
-        # Log incoming request data for debugging
-        logger.info(f"Upload request received - User: {current_user.email}, Name: {name}, Description: {description}")
-        logger.info(f"File details - Filename: {file.filename}, Content-Type: {file.content_type}, Size: {file.size if hasattr(file, 'size') else 'Unknown'}")
-        
-        # Validate file type
-        if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
+        # Validate file type (case-insensitive, so ".XLSX" uploads are accepted)
+        if file.filename.rpartition(".")[2].lower() not in ALLOWED_UPLOAD_EXTENSIONS:
             logger.warning(f"Invalid file type attempted: {file.filename}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,11 +76,6 @@ async def upload_catalog_file(
                 detail="Catalog name is required and cannot be empty"
             )
         
-        logger.info(f"File validation passed, proceeding with catalog creation...")
-        
-        # Read file content
-        file_content = await file.read()
-        
         # Create catalog data
         catalog_data = CatalogCreate(
             name=name,
@@ -64,7 +86,8 @@ async def upload_catalog_file(
         catalog = await catalog_service.create_catalog(
             catalog_data=catalog_data,
             user_id=str(current_user.id),
-            file_data=file_content,
+            # Hand over the spooled upload file rather than reading it all into memory
+            file_obj=file.file,
             file_name=file.filename
         )
         
@@ -87,17 +110,14 @@ async def upload_catalog_file(
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        logger.error(f"Unexpected error uploading catalog file: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Full traceback: {traceback.format_exc()}")
+        logger.exception(f"Unexpected error uploading catalog file: {type(e).__name__}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to upload catalog file"
         )
 
 
-@router.get("/", response_model=List[CatalogResponse])
+@router.get("/", responses={200: {"model": List[CatalogResponse]}})
 async def get_catalogs(
     limit: int = Query(100, ge=1, le=1000, description="Number of catalogs to return"),
     skip: int = Query(0, ge=0, description="Number of catalogs to skip"),
@@ -113,26 +133,7 @@ async def get_catalogs(
             status=status_filter
         )
         
-        catalog_responses = []
-        for catalog in catalogs:
-            catalog_response = CatalogResponse(
-                id=str(catalog.id),
-                name=catalog.name,
-                description=catalog.description,
-                category=catalog.category,
-                file_name=catalog.file_name,
-                file_size=catalog.file_size,
-                total_items=catalog.total_items,
-                enriched_items=catalog.enriched_items,
-                status=catalog.status,
-                created_at=catalog.created_at,
-                updated_at=catalog.updated_at,
-                enrichment_started_at=catalog.enrichment_started_at,
-                enrichment_completed_at=catalog.enrichment_completed_at
-            )
-            catalog_responses.append(catalog_response)
-        
-        return catalog_responses
+        return ORJSONResponse([_catalog_to_dict(catalog) for catalog in catalogs])
         
     except Exception as e:
         logger.error(f"Error fetching catalogs: {e}")
@@ -142,13 +143,18 @@ async def get_catalogs(
         )
 
 
-@router.get("/{catalog_id}", response_model=CatalogResponse)
+@router.get("/{catalog_id}", responses={200: {"model": CatalogResponse}})
 async def get_catalog(
     catalog_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific catalog by ID."""
     try:
+        cache_key = _catalog_cache_key(str(current_user.id), catalog_id)
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
         catalog = await catalog_service.get_catalog_by_id(catalog_id, str(current_user.id))
         
         if not catalog:
@@ -157,21 +163,9 @@ async def get_catalog(
                 detail="Catalog not found"
             )
         
-        return CatalogResponse(
-            id=str(catalog.id),
-            name=catalog.name,
-            description=catalog.description,
-            category=catalog.category,
-            file_name=catalog.file_name,
-            file_size=catalog.file_size,
-            total_items=catalog.total_items,
-            enriched_items=catalog.enriched_items,
-            status=catalog.status,
-            created_at=catalog.created_at,
-            updated_at=catalog.updated_at,
-            enrichment_started_at=catalog.enrichment_started_at,
-            enrichment_completed_at=catalog.enrichment_completed_at
-        )
+        response = ORJSONResponse(_catalog_to_dict(catalog))
+        await cache_service.set(cache_key, response.body, CATALOG_CACHE_SECONDS)
+        return response
         
     except HTTPException:
         raise
@@ -183,7 +177,7 @@ async def get_catalog(
         )
 
 
-@router.put("/{catalog_id}", response_model=CatalogResponse)
+@router.put("/{catalog_id}", responses={200: {"model": CatalogResponse}})
 async def update_catalog(
     catalog_id: str,
     catalog_update: CatalogUpdate,
@@ -201,21 +195,8 @@ async def update_catalog(
                 detail="Catalog not found"
             )
         
-        return CatalogResponse(
-            id=str(updated_catalog.id),
-            name=updated_catalog.name,
-            description=updated_catalog.description,
-            category=updated_catalog.category,
-            file_name=updated_catalog.file_name,
-            file_size=updated_catalog.file_size,
-            total_items=updated_catalog.total_items,
-            enriched_items=updated_catalog.enriched_items,
-            status=updated_catalog.status,
-            created_at=updated_catalog.created_at,
-            updated_at=updated_catalog.updated_at,
-            enrichment_started_at=updated_catalog.enrichment_started_at,
-            enrichment_completed_at=updated_catalog.enrichment_completed_at
-        )
+        await cache_service.delete(_catalog_cache_key(str(current_user.id), catalog_id))
+        return ORJSONResponse(_catalog_to_dict(updated_catalog))
         
     except HTTPException:
         raise
@@ -242,6 +223,7 @@ async def delete_catalog(
                 detail="Catalog not found"
             )
         
+        await cache_service.delete(_catalog_cache_key(str(current_user.id), catalog_id))
         return {"message": "Catalog deleted successfully"}
         
     except HTTPException:
@@ -261,37 +243,60 @@ async def get_catalog_summary(
 ):
     """Get summary statistics for a catalog."""
     try:
-        catalog = await catalog_service.get_catalog_by_id(catalog_id, str(current_user.id))
+        # One round trip: the catalog (only the fields we report) plus its products grouped by
+        # enrichment status, served by the products (catalog_id, user_id, enrichment_status) index
+        db = get_database()
+        user_id = current_user.id
+        pipeline = [
+            {"$match": {"_id": ObjectId(catalog_id), "user_id": user_id}},
+            {"$project": {
+                "name": 1,
+                "status": 1,
+                "total_items": 1,
+                "enriched_items": 1,
+                "created_at": 1,
+                "updated_at": 1,
+                "enrichment_started_at": 1,
+                "enrichment_completed_at": 1
+            }},
+            {"$lookup": {
+                "from": "products",
+                "localField": "_id",
+                "foreignField": "catalog_id",
+                "pipeline": [
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {
+                        "_id": "$enrichment_status",
+                        "count": {"$sum": 1}
+                    }}
+                ],
+                "as": "status_counts"
+            }}
+        ]
         
-        if not catalog:
+        results = await (await db.catalogs.aggregate(pipeline)).to_list(1)
+        
+        if not results:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Catalog not found"
             )
         
-        # Get product statistics from database
-        db = get_database()
-        pipeline = [
-            {"$match": {"catalog_id": ObjectId(catalog_id), "user_id": ObjectId(current_user.id)}},
-            {"$group": {
-                "_id": "$enrichment_status",
-                "count": {"$sum": 1}
-            }}
-        ]
-        
-        status_counts = await db.products.aggregate(pipeline).to_list(None)
+        catalog = results[0]
+        total_items = catalog.get("total_items", 0)
+        enriched_items = catalog.get("enriched_items", 0)
         
         # Format status summary
         status_summary = {}
-        for status_count in status_counts:
+        for status_count in catalog["status_counts"]:
             status_summary[status_count["_id"]] = status_count["count"]
         
-        return {
+        return ORJSONResponse({
             "catalog_id": catalog_id,
-            "name": catalog.name,
-            "status": catalog.status,
-            "total_items": catalog.total_items,
-            "enriched_items": catalog.enriched_items,
+            "name": catalog["name"],
+            "status": catalog.get("status", "uploaded"),
+            "total_items": total_items,
+            "enriched_items": enriched_items,
             "enrichment_progress": {
                 "completed": status_summary.get("completed", 0),
                 "failed": status_summary.get("failed", 0),
@@ -299,14 +304,14 @@ async def get_catalog_summary(
                 "processing": status_summary.get("processing", 0)
             },
             "progress_percentage": (
-                (catalog.enriched_items / catalog.total_items * 100) 
-                if catalog.total_items > 0 else 0
+                (enriched_items / total_items * 100) 
+                if total_items > 0 else 0
             ),
-            "created_at": catalog.created_at,
-            "updated_at": catalog.updated_at,
-            "enrichment_started_at": catalog.enrichment_started_at,
-            "enrichment_completed_at": catalog.enrichment_completed_at
-        }
+            "created_at": catalog.get("created_at"),
+            "updated_at": catalog.get("updated_at"),
+            "enrichment_started_at": catalog.get("enrichment_started_at"),
+            "enrichment_completed_at": catalog.get("enrichment_completed_at")
+        })
         
     except HTTPException:
         raise
@@ -319,13 +324,33 @@ async def get_catalog_summary(
 
 
 
-@router.post("/{catalog_id}/enrich")
+async def _run_enrichment(catalog_id: str, user_id: str, providers: List[str]):
+    """Enrich a catalog after the trigger request has been answered."""
+    try:
+        result = await local_enrichment_service.enrich_catalog(
+            catalog_id=catalog_id,
+            user_id=user_id,
+            provider=providers
+        )
+        logger.info(
+            f"Local enrichment finished for catalog {catalog_id} using {', '.join(providers)}: "
+            f"{result['enriched_items']}/{result['total_items']} enriched, status {result['status']}"
+        )
+    except Exception as e:
+        # enrich_catalog has already marked the catalog as errored
+        logger.exception(f"Local enrichment failed for catalog {catalog_id}: {e}")
+    finally:
+        await cache_service.delete(_catalog_cache_key(user_id, catalog_id))
+
+
+@router.post("/{catalog_id}/enrich", status_code=status.HTTP_202_ACCEPTED)
 async def trigger_enrichment(
     catalog_id: str,
-    provider: str = "amazon",  # Default to Amazon API
+    background_tasks: BackgroundTasks,
+    provider: str = "amazon",  # Default to Amazon API; comma-separate to use several, e.g. "amazon,keepa"
     current_user: User = Depends(get_current_active_user)
 ):
-    """Trigger enrichment for a specific catalog."""
+    """Start enrichment for a specific catalog; progress is reported by enrichment-status."""
     try:
         # Get catalog to verify ownership and status
         catalog = await catalog_service.get_catalog_by_id(catalog_id, str(current_user.id))
@@ -344,38 +369,42 @@ async def trigger_enrichment(
         
         # Validate provider
         available_providers = await local_enrichment_service.get_enrichment_providers()
-        if provider not in available_providers:
+        providers = [name.strip() for name in provider.split(",") if name.strip()]
+        invalid = [name for name in providers if name not in available_providers]
+        if not providers or invalid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid provider: {provider}. Available providers: {', '.join(available_providers)}"
             )
         
-        # Use local enrichment service for immediate processing
-        try:
-            enrichment_result = await local_enrichment_service.enrich_catalog(
-                catalog_id=catalog_id,
-                user_id=str(current_user.id),
-                provider=provider
-            )
-            
-            logger.info(f"Local enrichment completed for catalog {catalog_id} using {provider} provider")
-            return {
-                "message": "Enrichment process completed successfully",
-                "catalog_id": catalog_id,
-                "total_items": enrichment_result["total_items"],
-                "enriched_items": enrichment_result["enriched_items"],
-                "failed_items": enrichment_result["failed_items"],
-                "status": enrichment_result["status"],
-                "provider": provider
-            }
-            
-        except Exception as e:
-            logger.error(f"Local enrichment failed: {e}")
+        # Claim the catalog atomically so a repeated trigger can't start a second run
+        # before the background task has marked it as processing
+        db = get_database()
+        claim = await db.catalogs.update_one(
+            {
+                "_id": catalog.id,
+                "status": {"$nin": ["processing", "enriched", "completed", "partially_completed"]}
+            },
+            {"$set": {"status": "processing"}}
+        )
+        if claim.modified_count == 0:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Enrichment failed: {str(e)}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Catalog enrichment is already in progress"
             )
         
+        await cache_service.delete(_catalog_cache_key(str(current_user.id), catalog_id))
+        
+        # Enrichment can take minutes for large catalogs; run it after responding
+        background_tasks.add_task(_run_enrichment, catalog_id, str(current_user.id), providers)
+        
+        return {
+            "message": "Enrichment started",
+            "catalog_id": catalog_id,
+            "status": "accepted",
+            "provider": provider
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
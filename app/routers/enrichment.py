@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status
+from typing import Optional
 from ..services.enrichment_service import local_enrichment_service
 import logging
 
@@ -6,16 +7,22 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/enrichment", tags=["enrichment"])
 
+# Providers are registered when the service is constructed, so the response is built once
+_providers_response: Optional[dict] = None
+
 
 @router.get("/providers")
 async def get_enrichment_providers():
     """Get available enrichment providers."""
+    global _providers_response
     try:
-        providers = await local_enrichment_service.get_enrichment_providers()
-        return {
-            "providers": providers,
-            "default_provider": "amazon"
-        }
+        if _providers_response is None:
+            providers = await local_enrichment_service.get_enrichment_providers()
+            _providers_response = {
+                "providers": providers,
+                "default_provider": "amazon"
+            }
+        return _providers_response
     except Exception as e:
         logger.error(f"Error getting enrichment providers: {e}")
         raise HTTPException(
@@ -1,15 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from ..auth.dependencies import get_current_active_user
 from ..models.user import User
-from ..models.offer import OfferResponse, OfferUpdate
+from ..models.offer import Offer, OfferItem, OfferItemResponse, OfferResponse, OfferUpdate
+from ..responses import NEXT_CURSOR_HEADER, ORJSONResponse, PydanticResponse
+from bson import ObjectId
 from ..services.offer_service import offer_service
+from ..services.cache_service import cache_service
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/offers", tags=["offers"])
 
+OFFER_CACHE_SECONDS = 300
+
+
+def _offer_cache_key(user_id: str, offer_id: str) -> str:
+    """Cache key for a single offer, scoped to its owner."""
+    return f"offer:{user_id}:{offer_id}"
+
+
+def _item_to_response(item: OfferItem) -> OfferItemResponse:
+    """Build an OfferItemResponse from a stored OfferItem without re-running validation."""
+    return OfferItemResponse.model_construct(
+        product_id=str(item.product_id),  # Convert PyObjectId to string
+        original_price=item.original_price,
+        offer_price=item.offer_price,
+        discount_percentage=item.discount_percentage,
+        quantity_required=item.quantity_required,
+        max_quantity=item.max_quantity,
+        notes=item.notes
+    )
+
+
+def _offer_to_response(offer: Offer) -> OfferResponse:
+    """Build an OfferResponse from a stored Offer without re-running validation."""
+    return OfferResponse.model_construct(
+        id=str(offer.id),
+        catalog_id=str(offer.catalog_id),
+        name=offer.name,
+        description=offer.description,
+        offer_type=offer.offer_type,
+        valid_from=offer.valid_from,
+        valid_until=offer.valid_until,
+        is_active=offer.is_active,
+        items=[_item_to_response(item) for item in offer.items],
+        total_discount=offer.total_discount,
+        total_savings=offer.total_savings,
+        offer_score=offer.offer_score,
+        generation_method=offer.generation_method,
+        created_at=offer.created_at,
+        updated_at=offer.updated_at
+    )
+
 
 @router.post("/generate")
 async def generate_offers(
@@ -27,49 +72,14 @@ async def generate_offers(
             max_offers=max_offers
         )
         
-        # Convert to response models
-        offer_responses = []
-        for offer in offers:
-            # Convert OfferItem to OfferItemResponse
-            items_response = []
-            for item in offer.items:
-                item_response = {
-                    "product_id": str(item.product_id),  # Convert PyObjectId to string
-                    "original_price": item.original_price,
-                    "offer_price": item.offer_price,
-                    "discount_percentage": item.discount_percentage,
-                    "quantity_required": item.quantity_required,
-                    "max_quantity": item.max_quantity,
-                    "notes": item.notes
-                }
-                items_response.append(item_response)
-            
-            offer_response = OfferResponse(
-                id=str(offer.id),
-                catalog_id=str(offer.catalog_id),
-                name=offer.name,
-                description=offer.description,
-                offer_type=offer.offer_type,
-                valid_from=offer.valid_from,
-                valid_until=offer.valid_until,
-                is_active=offer.is_active,
-                items=items_response,
-                rules=offer.rules,
-                total_discount=offer.total_discount,
-                total_savings=offer.total_savings,
-                offer_score=offer.offer_score,
-                generation_method=offer.generation_method,
-                created_at=offer.created_at,
-                updated_at=offer.updated_at
-            )
-            offer_responses.append(offer_response)
+        offer_responses = [_offer_to_response(offer) for offer in offers]
         
-        return {
+        return await PydanticResponse.create({
             "message": f"Successfully generated {len(offer_responses)} offers",
             "catalog_id": catalog_id,
             "offer_type": offer_type,
             "offers": offer_responses
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(
@@ -84,62 +94,38 @@ async def generate_offers(
         )
 
 
-@router.get("/", response_model=List[OfferResponse])
+@router.get("/", responses={200: {"model": List[OfferResponse]}})
 async def get_offers(
     catalog_id: Optional[str] = Query(None, description="Filter by catalog ID"),
     offer_type: Optional[str] = Query(None, description="Filter by offer type"),
     limit: int = Query(100, ge=1, le=1000, description="Number of offers to return"),
     skip: int = Query(0, ge=0, description="Number of offers to skip"),
+    after: Optional[str] = Query(None, description="Return offers after this ID (the X-Next-Cursor of the previous page); faster than skip"),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all offers for the current user."""
+    if after and not ObjectId.is_valid(after):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
     try:
         offers = await offer_service.get_user_offers(
             user_id=str(current_user.id),
             catalog_id=catalog_id,
             offer_type=offer_type,
             limit=limit,
-            skip=skip
+            skip=skip,
+            after=after
         )
         
-        # Convert to response models
-        offer_responses = []
-        for offer in offers:
-            # Convert OfferItem to OfferItemResponse
-            items_response = []
-            for item in offer.items:
-                item_response = {
-                    "product_id": str(item.product_id),  # Convert PyObjectId to string
-                    "original_price": item.original_price,
-                    "offer_price": item.offer_price,
-                    "discount_percentage": item.discount_percentage,
-                    "quantity_required": item.quantity_required,
-                    "max_quantity": item.max_quantity,
-                    "notes": item.notes
-                }
-                items_response.append(item_response)
-            
-            offer_response = OfferResponse(
-                id=str(offer.id),
-                catalog_id=str(offer.catalog_id),
-                name=offer.name,
-                description=offer.description,
-                offer_type=offer.offer_type,
-                valid_from=offer.valid_from,
-                valid_until=offer.valid_until,
-                is_active=offer.is_active,
-                items=items_response,
-                rules=offer.rules,
-                total_discount=offer.total_discount,
-                total_savings=offer.total_savings,
-                offer_score=offer.offer_score,
-                generation_method=offer.generation_method,
-                created_at=offer.created_at,
-                updated_at=offer.updated_at
-            )
-            offer_responses.append(offer_response)
+        offer_responses = [_offer_to_response(offer) for offer in offers]
         
-        return offer_responses
+        response = await PydanticResponse.create(offer_responses)
+        if len(offer_responses) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = offer_responses[-1].id
+        return response
         
     except Exception as e:
         logger.error(f"Error fetching offers: {e}")
@@ -149,13 +135,18 @@ async def get_offers(
         )
 
 
-@router.get("/{offer_id}", response_model=OfferResponse)
+@router.get("/{offer_id}", responses={200: {"model": OfferResponse}})
 async def get_offer(
     offer_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific offer by ID."""
     try:
+        cache_key = _offer_cache_key(str(current_user.id), offer_id)
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
         offer = await offer_service.get_offer_by_id(offer_id, str(current_user.id))
         
         if not offer:
@@ -164,40 +155,9 @@ async def get_offer(
                 detail="Offer not found"
             )
         
-        # Convert OfferItem to OfferItemResponse
-        items_response = []
-        for item in offer.items:
-            item_response = {
-                "product_id": str(item.product_id),  # Convert PyObjectId to string
-                "original_price": item.original_price,
-                "offer_price": item.offer_price,
-                "discount_percentage": item.discount_percentage,
-                "quantity_required": item.quantity_required,
-                "max_quantity": item.max_quantity,
-                "notes": item.notes
-            }
-            items_response.append(item_response)
-        
-        offer_response = OfferResponse(
-            id=str(offer.id),
-            catalog_id=str(offer.catalog_id),
-            name=offer.name,
-            description=offer.description,
-            offer_type=offer.offer_type,
-            valid_from=offer.valid_from,
-            valid_until=offer.valid_until,
-            is_active=offer.is_active,
-            items=items_response,
-            rules=offer.rules,
-            total_discount=offer.total_discount,
-            total_savings=offer.total_savings,
-            offer_score=offer.offer_score,
-            generation_method=offer.generation_method,
-            created_at=offer.created_at,
-            updated_at=offer.updated_at
-        )
-        
-        return offer_response
+        response = PydanticResponse(_offer_to_response(offer))
+        await cache_service.set(cache_key, response.body, OFFER_CACHE_SECONDS)
+        return response
         
     except HTTPException:
         raise
@@ -209,7 +169,7 @@ async def get_offer(
         )
 
 
-@router.put("/{offer_id}", response_model=OfferResponse)
+@router.put("/{offer_id}", responses={200: {"model": OfferResponse}})
 async def update_offer(
     offer_id: str,
     offer_update: OfferUpdate,
@@ -218,7 +178,7 @@ async def update_offer(
     """Update an offer."""
     try:
         updated_offer = await offer_service.update_offer(
-            offer_id, str(current_user.id), offer_update.dict(exclude_unset=True)
+            offer_id, str(current_user.id), offer_update.model_dump(exclude_unset=True)
         )
         
         if not updated_offer:
@@ -227,40 +187,10 @@ async def update_offer(
                 detail="Offer not found"
             )
         
-        # Convert OfferItem to OfferItemResponse
-        items_response = []
-        for item in updated_offer.items:
-            item_response = {
-                "product_id": str(item.product_id),  # Convert PyObjectId to string
-                "original_price": item.original_price,
-                "offer_price": item.offer_price,
-                "discount_percentage": item.discount_percentage,
-                "quantity_required": item.quantity_required,
-                "max_quantity": item.max_quantity,
-                "notes": item.notes
-            }
-            items_response.append(item_response)
-        
-        offer_response = OfferResponse(
-            id=str(updated_offer.id),
-            catalog_id=str(updated_offer.catalog_id),
-            name=updated_offer.name,
-            description=updated_offer.description,
-            offer_type=updated_offer.offer_type,
-            valid_from=updated_offer.valid_from,
-            valid_until=updated_offer.valid_until,
-            is_active=updated_offer.is_active,
-            items=items_response,
-            rules=updated_offer.rules,
-            total_discount=updated_offer.total_discount,
-            total_savings=updated_offer.total_savings,
-            offer_score=updated_offer.offer_score,
-            generation_method=updated_offer.generation_method,
-            created_at=updated_offer.created_at,
-            updated_at=updated_offer.updated_at
-        )
+        await cache_service.delete(_offer_cache_key(str(current_user.id), offer_id))
+        offer_response = _offer_to_response(updated_offer)
         
-        return offer_response
+        return PydanticResponse(offer_response)
         
     except HTTPException:
         raise
@@ -287,6 +217,7 @@ async def delete_offer(
                 detail="Offer not found"
             )
         
+        await cache_service.delete(_offer_cache_key(str(current_user.id), offer_id))
         return {"message": "Offer deleted successfully"}
         
     except HTTPException:
@@ -306,43 +237,27 @@ async def get_catalog_offers_summary(
 ):
     """Get summary statistics for offers in a catalog."""
     try:
-        # Get all offers for the catalog
-        offers = await offer_service.get_user_offers(
-            user_id=str(current_user.id),
-            catalog_id=catalog_id
-        )
+        stats = await offer_service.get_offer_type_stats(str(current_user.id), catalog_id)
         
-        if not offers:
-            return {
+        if not stats:
+            return ORJSONResponse({
                 "catalog_id": catalog_id,
                 "total_offers": 0,
                 "offer_types": {},
                 "total_savings": 0,
                 "average_discount": 0,
                 "best_offer_score": 0
-            }
-        
-        # Calculate summary statistics
-        total_offers = len(offers)
-        offer_types = {}
-        total_savings = 0
-        total_discounts = 0
-        offer_scores = []
+            })
         
-        for offer in offers:
-            # Count offer types
-            offer_type = offer.offer_type
-            offer_types[offer_type] = offer_types.get(offer_type, 0) + 1
-            
-            # Calculate savings and discounts
-            total_savings += offer.total_savings
-            total_discounts += offer.total_discount
-            offer_scores.append(offer.offer_score)
+        offer_types = {row["_id"]: row["count"] for row in stats}
+        total_offers = sum(offer_types.values())
+        total_savings = math.fsum(row["total_savings"] for row in stats)
+        total_discounts = math.fsum(row["total_discount"] for row in stats)
         
         average_discount = round(total_discounts / total_offers, 2) if total_offers > 0 else 0
-        best_offer_score = max(offer_scores) if offer_scores else 0
+        best_offer_score = max(row["best_score"] for row in stats)
         
-        return {
+        return ORJSONResponse({
             "catalog_id": catalog_id,
             "total_offers": total_offers,
             "offer_types": offer_types,
@@ -354,7 +269,7 @@ async def get_catalog_offers_summary(
                 "bundle": offer_types.get("bundle", 0),
                 "flash": offer_types.get("flash", 0)
             }
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting catalog offers summary: {e}")
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from ..auth.dependencies import get_current_active_user
 from ..models.user import User
 from ..models.product import ProductResponse
 from ..database import get_database
+from ..services.cache_service import cache_service
+from ..responses import NEXT_CURSOR_HEADER, ORJSONResponse, PydanticResponse
 from bson import ObjectId
 import logging
 
@@ -11,21 +13,90 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Products are written once by enrichment and never edited through the API
+PRODUCT_CACHE_SECONDS = 300
 
-@router.get("/", response_model=List[ProductResponse])
+
+# Only the fields _product_to_dict reads, so original_data/enriched_data are never decoded
+_PRODUCT_PROJECTION = {
+    "_id": 1,
+    "catalog_id": 1,
+    "line_item_id": 1,
+    "name": 1,
+    "description": 1,
+    "category": 1,
+    "brand": 1,
+    "sku": 1,
+    "upc": 1,
+    "price": 1,
+    "currency": 1,
+    "quantity": 1,
+    "unit": 1,
+    "main_image": 1,
+    "images": 1,
+    "enrichment_status": 1,
+    "enriched_at": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+
+def _product_cache_key(user_id: str, product_id: str) -> str:
+    """Cache key for a single product, scoped to its owner."""
+    return f"product:{user_id}:{product_id}"
+
+
+async def _aggregate(collection, pipeline: list) -> list:
+    """Run an aggregation and collect all results."""
+    return await (await collection.aggregate(pipeline)).to_list(None)
+
+
+def _product_to_dict(product: dict) -> dict:
+    """Build the ProductResponse payload straight from a product document."""
+    return {
+        "id": str(product["_id"]),
+        "catalog_id": str(product["catalog_id"]),
+        "line_item_id": product["line_item_id"],
+        "name": product["name"],
+        "description": product.get("description"),
+        "category": product.get("category"),
+        "brand": product.get("brand"),
+        "sku": product.get("sku"),
+        "upc": product.get("upc"),
+        "price": product.get("price"),
+        "currency": product.get("currency", "USD"),
+        "quantity": product.get("quantity"),
+        "unit": product.get("unit"),
+        "main_image": product.get("main_image"),
+        "images": product.get("images"),
+        "enrichment_status": product.get("enrichment_status", "pending"),
+        "enriched_at": product.get("enriched_at"),
+        "created_at": product["created_at"],
+        "updated_at": product["updated_at"]
+    }
+
+
+@router.get("/", responses={200: {"model": List[ProductResponse]}})
 async def get_products(
     catalog_id: Optional[str] = Query(None, description="Filter by catalog ID"),
     enrichment_status: Optional[str] = Query(None, description="Filter by enrichment status"),
     limit: int = Query(100, ge=1, le=1000, description="Number of products to return"),
     skip: int = Query(0, ge=0, description="Number of products to skip"),
+    after: Optional[str] = Query(None, description="Return products after this ID (the X-Next-Cursor of the previous page); faster than skip"),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get enriched products for the current user."""
+    if after and not ObjectId.is_valid(after):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
     try:
         db = get_database()
         
         # Build filter query
-        filter_query = {"user_id": ObjectId(current_user.id)}
+        filter_query = {"user_id": current_user.id}
         
         if catalog_id:
             filter_query["catalog_id"] = ObjectId(catalog_id)
@@ -33,33 +104,25 @@ async def get_products(
         if enrichment_status:
             filter_query["enrichment_status"] = enrichment_status
         
+        if after:
+            # Keyset pagination: an index range on _id instead of scanning past `skip` documents
+            filter_query["_id"] = {"$gt": ObjectId(after)}
+        
         # Get products with pagination
-        cursor = db.products.find(filter_query).skip(skip).limit(limit)
-        
-        products = []
-        async for product in cursor:
-            product_response = ProductResponse(
-                id=str(product["_id"]),
-                catalog_id=str(product["catalog_id"]),
-                line_item_id=product["line_item_id"],
-                name=product["name"],
-                description=product.get("description"),
-                category=product.get("category"),
-                brand=product.get("brand"),
-                sku=product.get("sku"),
-                upc=product.get("upc"),
-                price=product.get("price"),
-                currency=product.get("currency", "USD"),
-                quantity=product.get("quantity"),
-                unit=product.get("unit"),
-                enrichment_status=product.get("enrichment_status", "pending"),
-                enriched_at=product.get("enriched_at"),
-                created_at=product["created_at"],
-                updated_at=product["updated_at"]
-            )
-            products.append(product_response)
+        cursor = (
+            db.products.find(filter_query, projection=_PRODUCT_PROJECTION)
+            .sort("_id", 1)
+            .skip(skip)
+            .limit(limit)
+            .batch_size(limit)
+        )
         
-        return products
+        products = [_product_to_dict(product) async for product in cursor]
+        
+        response = await PydanticResponse.create(products)
+        if len(products) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = products[-1]["id"]
+        return response
         
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
@@ -69,19 +132,24 @@ async def get_products(
         )
 
 
-@router.get("/{product_id}", response_model=ProductResponse)
+@router.get("/{product_id}", responses={200: {"model": ProductResponse}})
 async def get_product(
     product_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific product by ID."""
     try:
+        cache_key = _product_cache_key(str(current_user.id), product_id)
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
         db = get_database()
         
-        product = await db.products.find_one({
-            "_id": ObjectId(product_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        product = await db.products.find_one(
+            {"_id": ObjectId(product_id), "user_id": current_user.id},
+            projection=_PRODUCT_PROJECTION
+        )
         
         if not product:
             raise HTTPException(
@@ -89,27 +157,9 @@ async def get_product(
                 detail="Product not found"
             )
         
-        product_response = ProductResponse(
-            id=str(product["_id"]),
-            catalog_id=str(product["catalog_id"]),
-            line_item_id=product["line_item_id"],
-            name=product["name"],
-            description=product.get("description"),
-            category=product.get("category"),
-            brand=product.get("brand"),
-            sku=product.get("sku"),
-            upc=product.get("upc"),
-            price=product.get("price"),
-            currency=product.get("currency", "USD"),
-            quantity=product.get("quantity"),
-            unit=product.get("unit"),
-            enrichment_status=product.get("enrichment_status", "pending"),
-            enriched_at=product.get("enriched_at"),
-            created_at=product["created_at"],
-            updated_at=product["updated_at"]
-        )
-        
-        return product_response
+        response = ORJSONResponse(_product_to_dict(product))
+        await cache_service.set(cache_key, response.body, PRODUCT_CACHE_SECONDS)
+        return response
         
     except HTTPException:
         raise
@@ -129,42 +179,46 @@ async def get_catalog_products_summary(
     """Get summary statistics for products in a catalog."""
     try:
         db = get_database()
+        user_id = current_user.id
         
-        # Verify catalog ownership
-        catalog = await db.catalogs.find_one({
-            "_id": ObjectId(catalog_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        # One round trip: the ownership check on catalogs with the products' status breakdown
+        # joined in, rather than a separate find_one alongside the aggregation
+        pipeline = [
+            {"$match": {"_id": ObjectId(catalog_id), "user_id": user_id}},
+            {"$project": {"_id": 1}},
+            {"$lookup": {
+                "from": "products",
+                "localField": "_id",
+                "foreignField": "catalog_id",
+                "pipeline": [
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {
+                        "_id": "$enrichment_status",
+                        "count": {"$sum": 1}
+                    }}
+                ],
+                "as": "status_counts"
+            }}
+        ]
         
-        if not catalog:
+        results = await _aggregate(db.catalogs, pipeline)
+        
+        if not results:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Catalog not found"
             )
         
-        # Get product statistics
-        pipeline = [
-            {"$match": {"catalog_id": ObjectId(catalog_id), "user_id": ObjectId(current_user.id)}},
-            {"$group": {
-                "_id": "$enrichment_status",
-                "count": {"$sum": 1}
-            }}
-        ]
-        
-        status_counts = await db.products.aggregate(pipeline).to_list(None)
-        
-        # Get total count
-        total_products = await db.products.count_documents({
-            "catalog_id": ObjectId(catalog_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        status_counts = results[0]["status_counts"]
         
         # Format response
         status_summary = {}
         for status_count in status_counts:
             status_summary[status_count["_id"]] = status_count["count"]
+        # Every product falls in exactly one status group, so no separate count query is needed
+        total_products = sum(status_summary.values())
         
-        return {
+        return ORJSONResponse({
             "catalog_id": catalog_id,
             "total_products": total_products,
             "status_summary": status_summary,
@@ -174,7 +228,7 @@ async def get_catalog_products_summary(
                 "pending": status_summary.get("pending", 0),
                 "processing": status_summary.get("processing", 0)
             }
-        }
+        })
         
     except HTTPException:
         raise
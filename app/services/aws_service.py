@@ -1,33 +1,65 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
-from typing import Optional, Dict, Any
+from typing import BinaryIO, Optional, Dict, Any, List
 from ..config import settings
-import json
+import asyncio
+import orjson
+import tempfile
 import logging
 from datetime import datetime
+from functools import cached_property
 
 logger = logging.getLogger(__name__)
 
+# Downloads stay in memory up to this size, then spill to a temp file
+S3_DOWNLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+# SendMessageBatch accepts at most 10 entries per call
+SQS_BATCH_SIZE = 10
+
+
+def _encode_message(message: Dict[str, Any]) -> str:
+    """Serialize an SQS message body; ObjectIds and other unknown types become strings."""
+    return orjson.dumps(
+        message,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    ).decode()
+
+# Catalogs over 8 MB move as 8 MB parts (ranged GETs on download), several in parallel,
+# each retried on its own
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
 
 class AWSService:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region
-        )
-        
-        self.sqs_client = boto3.client(
-            'sqs',
+    # boto3 is synchronous: every call below runs in a worker thread so it never blocks
+    # the event loop. Clients are created on first use rather than at import time.
+
+    def _create_client(self, service_name: str):
+        return boto3.client(
+            service_name,
             aws_access_key_id=settings.aws_access_key_id,
             aws_secret_access_key=settings.aws_secret_access_key,
             region_name=settings.aws_region
         )
     
+    @cached_property
+    def s3_client(self):
+        return self._create_client('s3')
+    
+    @cached_property
+    def sqs_client(self):
+        return self._create_client('sqs')
+    
     async def upload_file_to_s3(
         self, 
-        file_data: bytes, 
+        file_obj: BinaryIO, 
         file_name: str, 
         user_id: str,
         catalog_id: str
@@ -37,11 +69,15 @@ class AWSService:
             # Create S3 key: users/{user_id}/catalogs/{catalog_id}/{file_name}
             s3_key = f"users/{user_id}/catalogs/{catalog_id}/{file_name}"
             
-            self.s3_client.put_object(
-                Bucket=settings.s3_bucket_name,
-                Key=s3_key,
-                Body=file_data,
-                ContentType='application/octet-stream'
+            # upload_fileobj reads the file in parts (multipart for large files), so the
+            # upload never needs the whole catalog in memory; run it off the event loop
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                file_obj,
+                settings.s3_bucket_name,
+                s3_key,
+                ExtraArgs={"ContentType": "application/octet-stream"},
+                Config=_TRANSFER_CONFIG
             )
             
             logger.info(f"File uploaded to S3: {s3_key}")
@@ -59,48 +95,86 @@ class AWSService:
         line_items: list
     ) -> bool:
         """Send enrichment message to SQS queue."""
-        try:
-            if not settings.sqs_queue_url:
-                logger.warning("SQS queue URL not configured, skipping message")
-                return False
-            
-            message_body = {
-                "catalog_id": str(catalog_id),
-                "user_id": str(user_id),
-                "file_path": file_path,
-                "line_items": line_items,
-                "timestamp": str(datetime.utcnow())
-            }
-            
-            response = self.sqs_client.send_message(
-                QueueUrl=settings.sqs_queue_url,
-                MessageBody=json.dumps(message_body)
-            )
-            
-            logger.info(f"Enrichment message sent to SQS: {response['MessageId']}")
-            return True
+        message_body = {
+            "catalog_id": str(catalog_id),
+            "user_id": str(user_id),
+            "file_path": file_path,
+            "line_items": line_items,
+            "timestamp": str(datetime.utcnow())
+        }
+        return await self.send_enrichment_messages([message_body]) == 1
+    
+    async def send_enrichment_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Send enrichment messages to SQS in batches of 10; returns how many were accepted."""
+        if not settings.sqs_queue_url:
+            logger.warning("SQS queue URL not configured, skipping message")
+            return 0
+        
+        sent = 0
+        for start in range(0, len(messages), SQS_BATCH_SIZE):
+            batch = messages[start:start + SQS_BATCH_SIZE]
+            entries = [
+                {"Id": str(i), "MessageBody": _encode_message(message)}
+                for i, message in enumerate(batch)
+            ]
+            try:
+                response = await asyncio.to_thread(
+                    self.sqs_client.send_message_batch,
+                    QueueUrl=settings.sqs_queue_url,
+                    Entries=entries
+                )
+            except ClientError as e:
+                logger.error(f"Error sending messages to SQS: {e}")
+                continue
             
-        except ClientError as e:
-            logger.error(f"Error sending message to SQS: {e}")
-            return False
+            failed = response.get("Failed", [])
+            for failure in failed:
+                logger.error(f"SQS rejected enrichment message: {failure.get('Code')} {failure.get('Message')}")
+            sent += len(batch) - len(failed)
+        
+        logger.info(f"Enrichment messages sent to SQS: {sent}/{len(messages)}")
+        return sent
     
     async def get_file_from_s3(self, file_path: str) -> Optional[bytes]:
         """Download file from S3."""
         try:
-            response = self.s3_client.get_object(
-                Bucket=settings.s3_bucket_name,
-                Key=file_path
-            )
-            return response['Body'].read()
+            return await asyncio.to_thread(self._read_s3_object, file_path)
             
         except ClientError as e:
             logger.error(f"Error downloading file from S3: {e}")
             return None
     
+    async def download_file_from_s3(self, file_path: str) -> Optional[BinaryIO]:
+        """Download file from S3 into a spooled temp file, positioned at the start; the caller closes it."""
+        file_obj = tempfile.SpooledTemporaryFile(max_size=S3_DOWNLOAD_SPOOL_BYTES)
+        try:
+            await asyncio.to_thread(
+                self.s3_client.download_fileobj,
+                settings.s3_bucket_name,
+                file_path,
+                file_obj,
+                Config=_TRANSFER_CONFIG
+            )
+        except ClientError as e:
+            file_obj.close()
+            logger.error(f"Error downloading file from S3: {e}")
+            return None
+        
+        file_obj.seek(0)
+        return file_obj
+    
+    def _read_s3_object(self, file_path: str) -> bytes:
+        response = self.s3_client.get_object(
+            Bucket=settings.s3_bucket_name,
+            Key=file_path
+        )
+        return response['Body'].read()
+    
     async def delete_file_from_s3(self, file_path: str) -> bool:
         """Delete file from S3."""
         try:
-            self.s3_client.delete_object(
+            await asyncio.to_thread(
+                self.s3_client.delete_object,
                 Bucket=settings.s3_bucket_name,
                 Key=file_path
             )
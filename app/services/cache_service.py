@@ -0,0 +1,70 @@
+from typing import Optional
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+
+class CacheService:
+    """Redis-backed response cache; every call is a no-op when REDIS_URL isn't configured."""
+
+    def __init__(self):
+        self._redis = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    async def connect(self):
+        """Connect to Redis if a URL is configured."""
+        if not settings.redis_url:
+            logger.info("REDIS_URL not set, response caching disabled")
+            return
+        if redis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed, response caching disabled")
+            return
+        self._redis = redis.from_url(settings.redis_url)
+        logger.info("Response caching enabled")
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for a key, or None on a miss or cache error."""
+        if self._redis is None:
+            return None
+        try:
+            return await self._redis.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache get failed for {key}: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes, expire: int):
+        """Cache a value for `expire` seconds."""
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, value, ex=expire)
+        except redis.RedisError as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    async def delete(self, *keys: str):
+        """Drop cached values, e.g. after the underlying data changed."""
+        if self._redis is None or not keys:
+            return
+        try:
+            await self._redis.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+# Global instance
+cache_service = CacheService()
@@ -1,9 +1,13 @@
+import asyncio
 import csv
 import io
-import json
-from typing import List, Dict, Any, Optional
+import orjson
+import os
+from typing import BinaryIO, List, Dict, Any, Optional, Union
 from bson import ObjectId
-from datetime import datetime
+from pymongo import ReturnDocument
+from datetime import datetime, timezone
+from functools import lru_cache
 from ..database import get_database
 from ..models.catalog import Catalog, CatalogCreate, CatalogUpdate
 from ..models.product import Product, ProductCreate
@@ -13,9 +17,21 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _oid(value: str) -> ObjectId:
+    """Parse an ID string; the same user and catalog IDs recur across requests."""
+    return ObjectId(value)
+
+
+def _to_catalog(doc: Dict[str, Any]) -> Catalog:
+    """Build a Catalog from a stored document; it was validated on write, so skip re-validation."""
+    return Catalog.model_construct(**doc)
+
+
 class CatalogService:
     def __init__(self):
         self._db = None
+        self._catalogs = None
 
     @property
     def db(self):
@@ -23,68 +39,48 @@ class CatalogService:
             self._db = get_database()
         return self._db
 
+    @property
+    def catalogs(self):
+        # pymongo builds a new Collection object on every db.<name> access, so bind it once
+        if self._catalogs is None:
+            self._catalogs = self.db.catalogs
+        return self._catalogs
+
     async def create_catalog(
         self, 
         catalog_data: CatalogCreate, 
         user_id: str,
-        file_data: bytes,
+        file_obj: BinaryIO,
         file_name: str
     ) -> Catalog:
-        """Create a new catalog and upload file to S3."""
+        """Create a new catalog and upload file to S3, streaming from a file-like object."""
         try:
             # Create catalog document
-            # Handle both Pydantic v1 and v2
-            try:
-                catalog_dict = catalog_data.model_dump()
-            except AttributeError:
-                catalog_dict = catalog_data.dict()
-            catalog_dict["user_id"] = ObjectId(user_id)
+            catalog_dict = catalog_data.model_dump()
+            catalog_dict["user_id"] = _oid(user_id)
             catalog_dict["file_name"] = file_name
-            catalog_dict["file_size"] = len(file_data)
+            catalog_dict["file_size"] = file_obj.seek(0, os.SEEK_END)
+            file_obj.seek(0)
             catalog_dict["status"] = "uploaded"  # Set default status
             catalog_dict["enriched_items"] = 0   # Set default enriched items
-            catalog_dict["created_at"] = datetime.utcnow()
-            catalog_dict["updated_at"] = datetime.utcnow()
+            catalog_dict["created_at"] = catalog_dict["updated_at"] = datetime.now(timezone.utc)
             
-            # Insert catalog into database
-            result = await self.db.catalogs.insert_one(catalog_dict)
-            catalog_dict["_id"] = result.inserted_id
+            # Count line items; enrichment re-reads the file from S3, so rows aren't kept here
+            catalog_dict["total_items"] = await self._count_catalog_items(file_obj, file_name)
             
-            # Upload file to S3
-            file_path = await aws_service.upload_file_to_s3(
-                file_data, file_name, user_id, str(result.inserted_id)
-            )
+            # Generate the ID client-side so the S3 key is known before the single insert
+            catalog_dict["_id"] = ObjectId()
             
-            logger.info(f"Uploaded file to S3: {file_path}")
-            
-            # Update catalog with S3 file path
-            update_result = await self.db.catalogs.update_one(
-                {"_id": result.inserted_id},
-                {"$set": {"file_path": file_path}}
+            # Upload file to S3
+            file_obj.seek(0)
+            catalog_dict["file_path"] = await aws_service.upload_file_to_s3(
+                file_obj, file_name, user_id, str(catalog_dict["_id"])
             )
             
-            logger.info(f"Updated catalog with file_path: {update_result.modified_count} documents modified")
+            # Insert the complete catalog document in one write
+            await self.catalogs.insert_one(catalog_dict)
             
-            # Verify the update
-            verify_catalog = await self.db.catalogs.find_one({"_id": result.inserted_id})
-            logger.info(f"Verification - file_path in DB: {verify_catalog.get('file_path') if verify_catalog else 'NOT FOUND'}")
-            
-            # Process file to count line items
-            line_items = await self._parse_catalog_file(file_data, file_name)
-            total_items = len(line_items)
-            
-            # Update catalog with item count
-            await self.db.catalogs.update_one(
-                {"_id": result.inserted_id},
-                {"$set": {"total_items": total_items}}
-            )
-            
-            # Fetch the updated catalog from database to ensure all fields are present
-            updated_catalog = await self.db.catalogs.find_one({"_id": result.inserted_id})
-            if updated_catalog:
-                return Catalog(**updated_catalog)
-            else:
-                raise Exception("Failed to retrieve created catalog from database")
+            return Catalog(**catalog_dict)
             
         except Exception as e:
             logger.error(f"Error creating catalog: {e}")
@@ -94,19 +90,21 @@ class CatalogService:
         """Get all catalogs for a specific user with optional filtering and pagination."""
         try:
             # Build filter query
-            filter_query = {"user_id": ObjectId(user_id)}
+            filter_query = {"user_id": _oid(user_id)}
             if status:
                 filter_query["status"] = status
             
             # Apply pagination and filtering
-            cursor = self.db.catalogs.find(filter_query).skip(skip).limit(limit)
-            catalogs = []
-            async for catalog in cursor:
-                logger.info(f"Raw catalog from DB: {catalog}")
-                logger.info(f"file_path present: {'file_path' in catalog}")
-                logger.info(f"file_path value: {catalog.get('file_path')}")
-                catalogs.append(Catalog(**catalog))
-            return catalogs
+            # batch_size(limit) returns the whole page in the first batch, with no getMore round trips
+            cursor = (
+                self.catalogs.find(filter_query)
+                .sort("created_at", -1)
+                .skip(skip)
+                .limit(limit)
+                .batch_size(limit)
+            )
+            catalogs = await cursor.to_list(length=limit)
+            return [_to_catalog(catalog) for catalog in catalogs]
         except Exception as e:
             logger.error(f"Error fetching user catalogs: {e}")
             raise Exception(f"Failed to fetch catalogs: {e}")
@@ -114,11 +112,11 @@ class CatalogService:
     async def get_catalog_by_id(self, catalog_id: str, user_id: str) -> Optional[Catalog]:
         """Get a specific catalog by ID for a user."""
         try:
-            catalog = await self.db.catalogs.find_one({
-                "_id": ObjectId(catalog_id),
-                "user_id": ObjectId(user_id)
+            catalog = await self.catalogs.find_one({
+                "_id": _oid(catalog_id),
+                "user_id": _oid(user_id)
             })
-            return Catalog(**catalog) if catalog else None
+            return _to_catalog(catalog) if catalog else None
         except Exception as e:
             logger.error(f"Error fetching catalog: {e}")
             raise Exception(f"Failed to fetch catalog: {e}")
@@ -131,21 +129,16 @@ class CatalogService:
     ) -> Optional[Catalog]:
         """Update catalog information."""
         try:
-            # Handle both Pydantic v1 and v2
-            try:
-                update_dict = update_data.model_dump(exclude_unset=True)
-            except AttributeError:
-                update_dict = update_data.dict(exclude_unset=True)
-            update_dict["updated_at"] = datetime.utcnow()
+            update_dict = update_data.model_dump(exclude_unset=True)
+            update_dict["updated_at"] = datetime.now(timezone.utc)
             
-            result = await self.db.catalogs.update_one(
-                {"_id": ObjectId(catalog_id), "user_id": ObjectId(user_id)},
-                {"$set": update_dict}
+            # Update and read back the new document in one atomic round trip
+            catalog = await self.catalogs.find_one_and_update(
+                {"_id": _oid(catalog_id), "user_id": _oid(user_id)},
+                {"$set": update_dict},
+                return_document=ReturnDocument.AFTER
             )
-            
-            if result.modified_count > 0:
-                return await self.get_catalog_by_id(catalog_id, user_id)
-            return None
+            return _to_catalog(catalog) if catalog else None
             
         except Exception as e:
             logger.error(f"Error updating catalog: {e}")
@@ -154,20 +147,23 @@ class CatalogService:
     async def delete_catalog(self, catalog_id: str, user_id: str) -> bool:
         """Delete a catalog and its associated file."""
         try:
-            # Get catalog to find file path
-            catalog = await self.get_catalog_by_id(catalog_id, user_id)
+            # Only the file path is needed to clean up S3
+            catalog = await self.catalogs.find_one(
+                {"_id": _oid(catalog_id), "user_id": _oid(user_id)},
+                projection={"file_path": 1}
+            )
             if not catalog:
                 return False
             
-            # Delete file from S3
-            if catalog.file_path:
-                await aws_service.delete_file_from_s3(catalog.file_path)
-            
-            # Delete catalog from database
-            result = await self.db.catalogs.delete_one({
-                "_id": ObjectId(catalog_id),
-                "user_id": ObjectId(user_id)
-            })
+            # The S3 and database deletes are independent, so run them concurrently
+            delete_catalog = self.catalogs.delete_one({"_id": catalog["_id"]})
+            if catalog.get("file_path"):
+                _, result = await asyncio.gather(
+                    aws_service.delete_file_from_s3(catalog["file_path"]),
+                    delete_catalog
+                )
+            else:
+                result = await delete_catalog
             
             return result.deleted_count > 0
             
@@ -175,38 +171,102 @@ class CatalogService:
             logger.error(f"Error deleting catalog: {e}")
             raise Exception(f"Failed to delete catalog: {e}")
     
-    async def _parse_catalog_file(self, file_data: bytes, file_name: str) -> List[Dict[str, Any]]:
+    async def _parse_catalog_file(self, file_data: Union[bytes, BinaryIO], file_name: str) -> List[Dict[str, Any]]:
         """Parse catalog file and extract line items."""
         try:
-            # Determine file type and parse accordingly
-            if file_name.lower().endswith('.csv'):
-                return await self._parse_csv_file(file_data)
-            elif file_name.lower().endswith('.json'):
-                return await self._parse_json_file(file_data)
-            elif file_name.lower().endswith('.xlsx'):
-                return await self._parse_excel_file(file_data)
-            else:
-                raise ValueError(f"Unsupported file format: {file_name}")
+            # Parsing is CPU-bound; run it in a worker thread so the event loop keeps serving
+            return await asyncio.to_thread(self._parse_catalog_file_sync, file_data, file_name)
                 
         except Exception as e:
             logger.error(f"Error parsing catalog file: {e}")
             raise Exception(f"Failed to parse catalog file: {e}")
     
-    async def _parse_csv_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    async def _count_catalog_items(self, file_data: BinaryIO, file_name: str) -> int:
+        """Count the line items in a catalog file, validating it along the way."""
+        try:
+            return await asyncio.to_thread(self._count_catalog_items_sync, file_data, file_name)
+                
+        except Exception as e:
+            logger.error(f"Error parsing catalog file: {e}")
+            raise Exception(f"Failed to parse catalog file: {e}")
+    
+    def _count_catalog_items_sync(self, file_data: BinaryIO, file_name: str) -> int:
+        if file_name.lower().endswith('.csv'):
+            return self._count_csv_rows(file_data)
+        return len(self._parse_catalog_file_sync(file_data, file_name))
+    
+    def _count_csv_rows(self, file_data: BinaryIO) -> int:
+        import polars as pl
+        
+        # Count natively without materializing rows, applying the same blank-row rule as
+        # _parse_csv_file; ragged or empty files fall back to streaming csv.reader below
+        try:
+            return (
+                pl.scan_csv(file_data, infer_schema=False)
+                .filter(pl.any_horizontal(pl.all().fill_null("") != ""))
+                .select(pl.len())
+                .collect()
+                .item()
+            )
+        except pl.exceptions.PolarsError as e:
+            logger.warning(f"Falling back to csv module for CSV row count: {e}")
+            file_data.seek(0)
+        
+        text = io.TextIOWrapper(file_data, encoding='utf-8', newline='')
+        try:
+            reader = csv.reader(text)
+            next(reader, None)  # header
+            # Blank and all-empty rows aren't line items
+            return sum(1 for row in reader if any(row))
+        finally:
+            # Detach so the wrapper doesn't close the caller's file
+            text.detach()
+    
+    def _parse_catalog_file_sync(self, file_data: Union[bytes, BinaryIO], file_name: str) -> List[Dict[str, Any]]:
+        if isinstance(file_data, bytes):
+            file_data = io.BytesIO(file_data)
+
+        # Determine file type and parse accordingly
+        if file_name.lower().endswith('.csv'):
+            return self._parse_csv_file(file_data)
+        elif file_name.lower().endswith('.json'):
+            return self._parse_json_file(file_data)
+        elif file_name.lower().endswith('.xlsx'):
+            return self._parse_excel_file(file_data)
+        else:
+            raise ValueError(f"Unsupported file format: {file_name}")
+    
+    def _parse_csv_file(self, file_data: BinaryIO) -> List[Dict[str, Any]]:
         """Parse CSV file and return line items."""
         try:
-            text = file_data.decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(text))
-            return [dict(row) for row in csv_reader]
+            import polars as pl
+            
+            # Polars' native reader, with type inference off, yields the same all-string rows
+            # as csv.DictReader; ragged or empty files fall back to the csv module below.
+            # Polars reads blank lines as all-empty rows, so those are dropped (in both paths)
+            try:
+                df = pl.read_csv(file_data, infer_schema=False, empty_string_is_null=False)
+                return df.filter(pl.any_horizontal(pl.all().fill_null("") != "")).to_dicts()
+            except pl.exceptions.PolarsError as e:
+                logger.warning(f"Falling back to csv module for CSV parsing: {e}")
+                file_data.seek(0)
+            
+            # Decode incrementally instead of materializing the whole file as one string
+            text = io.TextIOWrapper(file_data, encoding='utf-8', newline='')
+            try:
+                return [dict(row) for row in csv.DictReader(text) if any(row.values())]
+            finally:
+                # Detach so the wrapper doesn't close the caller's file
+                text.detach()
         except Exception as e:
             logger.error(f"Error parsing CSV file: {e}")
             raise Exception(f"Failed to parse CSV file: {e}")
     
-    async def _parse_json_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    def _parse_json_file(self, file_data: BinaryIO) -> List[Dict[str, Any]]:
         """Parse JSON file and return line items."""
         try:
-            text = file_data.decode('utf-8')
-            data = json.loads(text)
+            # orjson parses the raw bytes directly, without a separate utf-8 decode pass
+            data = orjson.loads(file_data.read())
             # Assume JSON is an array of line items or has a 'items' key
             if isinstance(data, list):
                 return data
@@ -218,33 +278,17 @@ class CatalogService:
             logger.error(f"Error parsing JSON file: {e}")
             raise Exception(f"Failed to parse JSON file: {e}")
     
-    async def _parse_excel_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    def _parse_excel_file(self, file_data: BinaryIO) -> List[Dict[str, Any]]:
         """Parse Excel file and return line items."""
         try:
             import pandas as pd
-            import io
-            
-            # Read Excel file using pandas
-            excel_data = io.BytesIO(file_data)
             
-            # Try to read the first sheet
-            df = pd.read_excel(excel_data, sheet_name=0)
+            # Read the first sheet with calamine (Rust), much faster than the default openpyxl
+            df = pd.read_excel(file_data, sheet_name=0, engine="calamine")
             
-            # Convert DataFrame to list of dictionaries
-            line_items = []
-            for _, row in df.iterrows():
-                # Convert pandas Series to dict, handling NaN values
-                item = {}
-                for column, value in row.items():
-                    if pd.isna(value):
-                        item[column] = None
-                    else:
-                        # Convert numpy types to Python types
-                        if hasattr(value, 'item'):
-                            item[column] = value.item()
-                        else:
-                            item[column] = value
-                line_items.append(item)
+            # Convert DataFrame to list of dictionaries in one pass: object dtype yields
+            # Python scalars, and NaN cells become None
+            line_items = df.astype(object).where(df.notna(), None).to_dict(orient="records")
             
             logger.info(f"Successfully parsed Excel file with {len(line_items)} items")
             return line_items
@@ -1,18 +1,115 @@
 import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import random
+import time
+from typing import AsyncIterator, BinaryIO, Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
 from bson import ObjectId
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError, PyMongoError
 import httpx
+import orjson
 from ..database import get_database
 from ..models.product import Product, ProductCreate
 from ..models.catalog import Catalog
+from ..models.user import _now
 from ..config import settings
 from ..services.aws_service import aws_service
-import json
 
 logger = logging.getLogger(__name__)
 
+# Candidate catalog column names, in priority order
+_SEARCH_NAME_KEYS = ("name", "product_name", "item_name", "title", "product_title")
+_SEARCH_DESC_KEYS = ("description", "product_description", "item_description", "details")
+_SEARCH_SKU_KEYS = ("sku", "product_sku", "item_sku", "product_code", "item_code")
+_SEARCH_SKIP_KEYS = frozenset(("id", "price", "quantity", "currency", "unit"))
+
+_NAME_KEYS = ("Style Name", "name", "product_name", "item_name", "title", "product_title")
+_CATEGORY_KEYS = ("Category", "Subcategory", "Division", "category", "product_category", "item_category", "type", "product_type")
+_BRAND_KEYS = ("brand", "product_brand", "item_brand", "manufacturer", "make")
+_SKU_KEYS = ("SKU", "sku", "product_sku", "item_sku", "product_code", "item_code")
+_UPC_KEYS = ("UPC", "upc", "product_upc", "item_upc", "barcode", "ean")
+_PRICE_KEYS = ("Offer Price", "Wholesale", "RRP", "price", "product_price", "item_price", "cost", "unit_price")
+_CURRENCY_KEYS = ("Currency", "currency", "product_currency", "item_currency")
+_QUANTITY_KEYS = ("Quantity Available", "quantity", "product_quantity", "item_quantity", "qty", "stock")
+_UNIT_KEYS = ("unit", "product_unit", "item_unit", "uom", "measurement_unit")
+
+_MOCK_KEEPA_IMAGE_URL = "https://m.media-amazon.com/images/I/71{}L._AC_SL1500_{}.jpg"
+_MOCK_KEEPA_IMAGE_SUFFIXES = ("", "2_", "3_")
+
+# (main image field, images field) in enriched_data, by provider name
+_IMAGE_FIELDS = {
+    "keepa_api": ("keepa_main_image", "keepa_images"),
+    "amazon_api": ("amazon_images", "amazon_images")
+}
+
+# Enriched products are written with insert_many in chunks of this size instead of one
+# insert_one per item; well under the 16 MB / 100k-document batch limits
+PRODUCT_INSERT_BATCH_SIZE = 1000
+
+# Catalog rows are fed through a bounded queue to this many enrichment workers
+ENRICHMENT_WORKERS = 64
+
+# Catalog progress is written on this interval instead of after every item or batch
+ENRICHMENT_PROGRESS_INTERVAL_SECONDS = 2.0
+
+# AIMD bounds for concurrent Keepa requests; calls slower than the target latency count as overload
+KEEPA_MIN_CONCURRENCY = 2
+KEEPA_INITIAL_CONCURRENCY = 10
+KEEPA_MAX_CONCURRENCY = 50
+KEEPA_TARGET_LATENCY_SECONDS = 2.0
+
+# Transient Keepa failures are retried with jittered exponential backoff before falling back to mock data
+KEEPA_MAX_ATTEMPTS = 5
+KEEPA_RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+
+# Below this many tokens (reported as tokensLeft), requests pause until Keepa's refillIn has elapsed
+KEEPA_MIN_TOKENS = 10
+
+# Real Keepa results are reused for repeated search terms until they are this old, so prices
+# and ratings stay fresh; oldest entries are evicted past the size cap
+KEEPA_RESULT_CACHE_SIZE = 4096
+KEEPA_RESULT_CACHE_TTL_SECONDS = 900
+
+# Product details for resolved ASINs are fetched in one /product call per batch, collected over a short window
+KEEPA_PRODUCT_BATCH_SIZE = 100
+KEEPA_PRODUCT_BATCH_WINDOW_SECONDS = 0.05
+
+
+class AIMDLimiter:
+    """Concurrency limit that grows by one after healthy calls and halves on overload."""
+    
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = float("-inf")
+    
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+    
+    def increase(self):
+        self.limit = min(self.maximum, self.limit + 1)
+    
+    def decrease(self, started: float) -> bool:
+        """Halve the limit once per congestion window; returns whether it was applied."""
+        # Requests sent before the last decrease ran under the old limit; that overload is already counted
+        if started < self._last_decrease:
+            return False
+        self.limit = max(self.minimum, self.limit // 2)
+        self._last_decrease = time.monotonic()
+        return True
+
 
 class EnrichmentProvider:
     """Base class for enrichment providers."""
@@ -23,6 +120,42 @@ class EnrichmentProvider:
     async def enrich_item(self, item_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enrich a single item. Override in subclasses."""
         raise NotImplementedError
+    
+    async def aclose(self):
+        """Release any resources held by the provider."""
+    
+    def _extract_search_term(self, item_data: Dict[str, Any]) -> str:
+        """Extract search term from item data."""
+        # Try name fields first
+        for field in _SEARCH_NAME_KEYS:
+            value = item_data.get(field)
+            if value:
+                return str(value)
+        
+        # Try description fields
+        for field in _SEARCH_DESC_KEYS:
+            value = item_data.get(field)
+            if value:
+                return str(value)[:100]
+        
+        # Try SKU fields
+        for field in _SEARCH_SKU_KEYS:
+            value = item_data.get(field)
+            if value:
+                return str(value)
+        
+        # Fallback to concatenating available fields
+        available_fields = [
+            str(value) for key, value in item_data.items()
+            if value and key not in _SEARCH_SKIP_KEYS
+        ]
+        
+        if available_fields:
+            return " ".join(available_fields[:3])  # Use first 3 meaningful fields
+        
+        # Last resort: a stable digest of the row, without building its repr
+        digest = hashlib.blake2b(orjson.dumps(item_data, option=orjson.OPT_SORT_KEYS, default=str), digest_size=4).digest()
+        return f"Product {int.from_bytes(digest, 'big') % 1000000}"
 
 
 class AmazonAPIProvider(EnrichmentProvider):
@@ -47,7 +180,7 @@ class AmazonAPIProvider(EnrichmentProvider):
                 "enrichment_source": self.name,
                 "enrichment_status": "completed",
                 "enriched_data": enriched_data,
-                "enriched_at": datetime.utcnow()
+                "enriched_at": _now()
             }
             
         except Exception as e:
@@ -56,53 +189,18 @@ class AmazonAPIProvider(EnrichmentProvider):
                 "enrichment_source": self.name,
                 "enrichment_status": "failed",
                 "enrichment_errors": [str(e)],
-                "enriched_at": datetime.utcnow()
+                "enriched_at": _now()
             }
     
-    def _extract_search_term(self, item_data: Dict[str, Any]) -> str:
-        """Extract search term from item data."""
-        # Try to find the best search term from available fields
-        # Common catalog field names
-        name_fields = ["name", "product_name", "item_name", "title", "product_title"]
-        desc_fields = ["description", "product_description", "item_description", "details"]
-        sku_fields = ["sku", "product_sku", "item_sku", "product_code", "item_code"]
-        
-        # Try name fields first
-        for field in name_fields:
-            if item_data.get(field):
-                return str(item_data[field])
-        
-        # Try description fields
-        for field in desc_fields:
-            if item_data.get(field):
-                desc = str(item_data[field])
-                return desc[:100] if len(desc) > 100 else desc
-        
-        # Try SKU fields
-        for field in sku_fields:
-            if item_data.get(field):
-                return str(item_data[field])
-        
-        # Fallback to concatenating available fields
-        available_fields = []
-        for key, value in item_data.items():
-            if value and key not in ['id', 'price', 'quantity', 'currency', 'unit']:
-                available_fields.append(str(value))
-        
-        if available_fields:
-            return " ".join(available_fields[:3])  # Use first 3 meaningful fields
-        
-        # Last resort
-        return f"Product {hash(str(item_data)) % 1000000}"
-    
     async def _call_amazon_api(self, search_term: str) -> Dict[str, Any]:
         """Call Amazon API (simulated for now)."""
         # Simulate API delay
         await asyncio.sleep(0.1)
         
         # Mock response - replace with actual Amazon API call
+        term_hash = hash(search_term)
         return {
-            "amazon_product_id": f"AMZ_{hash(search_term) % 1000000}",
+            "amazon_product_id": f"AMZ_{term_hash % 1000000}",
             "amazon_price": 99.99,
             "amazon_rating": 4.5,
             "amazon_review_count": 1250,
@@ -110,7 +208,7 @@ class AmazonAPIProvider(EnrichmentProvider):
             "amazon_brand": "Generic Brand",
             "amazon_features": ["Wireless", "Bluetooth", "Noise Cancelling"],
             "amazon_images": ["https://example.com/image1.jpg"],
-            "amazon_url": f"https://amazon.com/product/{hash(search_term) % 1000000}"
+            "amazon_url": f"https://amazon.com/product/{term_hash % 1000000}"
         }
 
 
@@ -121,6 +219,96 @@ class KeepaAPIProvider(EnrichmentProvider):
         super().__init__("keepa_api")
         self.api_key = getattr(settings, 'keepa_api_key', None)
         self.base_url = "https://api.keepa.com"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter = AIMDLimiter(KEEPA_INITIAL_CONCURRENCY, KEEPA_MIN_CONCURRENCY, KEEPA_MAX_CONCURRENCY)
+        self._tokens_left: Optional[int] = None
+        self._throttled_until = 0.0
+        self._result_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._pending_products: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set = set()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client, so enrichment calls reuse pooled keep-alive connections."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _record_tokens(self, data: Dict[str, Any]):
+        """Track Keepa's remaining token budget and schedule a pause when it runs low."""
+        tokens_left = data.get("tokensLeft")
+        if tokens_left is None:
+            return
+        self._tokens_left = tokens_left
+        if tokens_left < KEEPA_MIN_TOKENS:
+            refill_in = data.get("refillIn") or 0
+            self._throttled_until = max(self._throttled_until, time.monotonic() + refill_in / 1000)
+            logger.warning(f"Keepa API - {tokens_left} tokens left, pausing requests for {refill_in}ms")
+    
+    async def _wait_if_throttled(self):
+        delay = self._throttled_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _get(self, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET through the AIMD limiter, feeding status and latency back into it."""
+        await self._wait_if_throttled()
+        async with self._limiter:
+            started = time.monotonic()
+            try:
+                response = await self._get_client().get(url, params=params)
+            except httpx.TimeoutException:
+                self._limiter.decrease(started)
+                raise
+            elapsed = time.monotonic() - started
+            if response.status_code == 429 or response.status_code >= 500 or elapsed > KEEPA_TARGET_LATENCY_SECONDS:
+                if self._limiter.decrease(started):
+                        logger.warning(f"Keepa API - Backing off to {self._limiter.limit} concurrent requests "
+                                   f"(status {response.status_code}, {elapsed:.2f}s)")
+            else:
+                self._limiter.increase()
+            return response
+    
+    async def _get_with_retry(self, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET with retries on timeouts, transport errors and retryable statuses, honoring Retry-After."""
+        for attempt in range(KEEPA_MAX_ATTEMPTS):
+            last_attempt = attempt == KEEPA_MAX_ATTEMPTS - 1
+            retry_after = None
+            try:
+                response = await self._get(url, params)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"Keepa API - {type(e).__name__} on attempt {attempt + 1}, retrying")
+            else:
+                if response.status_code not in KEEPA_RETRY_STATUSES or last_attempt:
+                    return response
+                logger.warning(f"Keepa API - Status {response.status_code} on attempt {attempt + 1}, retrying")
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code == 429:
+                    # Keepa's 429 body still reports tokensLeft/refillIn
+                    try:
+                        self._record_tokens(orjson.loads(response.content))
+                    except ValueError:
+                        pass
+            
+            if retry_after and retry_after.isdigit():
+                await asyncio.sleep(int(retry_after))
+            else:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * 2 ** attempt)
     
     async def enrich_item(self, item_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enrich item using Keepa API."""
@@ -135,7 +323,7 @@ class KeepaAPIProvider(EnrichmentProvider):
                 "enrichment_source": self.name,
                 "enrichment_status": "completed",
                 "enriched_data": enriched_data,
-                "enriched_at": datetime.utcnow()
+                "enriched_at": _now()
             }
             
         except Exception as e:
@@ -144,167 +332,59 @@ class KeepaAPIProvider(EnrichmentProvider):
                 "enrichment_source": self.name,
                 "enrichment_status": "failed",
                 "enrichment_errors": [str(e)],
-                "enriched_at": datetime.utcnow()
+                "enriched_at": _now()
             }
     
-    def _extract_search_term(self, item_data: Dict[str, Any]) -> str:
-        """Extract search term from item data."""
-        # Common catalog field names
-        name_fields = ["name", "product_name", "item_name", "title", "product_title"]
-        desc_fields = ["description", "product_description", "item_description", "details"]
-        sku_fields = ["sku", "product_sku", "item_sku", "product_code", "item_code"]
-        
-        # Try name fields first
-        for field in name_fields:
-            if item_data.get(field):
-                return str(item_data[field])
-        
-        # Try description fields
-        for field in desc_fields:
-            if item_data.get(field):
-                desc = str(item_data[field])
-                return desc[:100] if len(desc) > 100 else desc
-        
-        # Try SKU fields
-        for field in sku_fields:
-            if item_data.get(field):
-                return str(item_data[field])
-        
-        # Fallback to concatenating available fields
-        available_fields = []
-        for key, value in item_data.items():
-            if value and key not in ['id', 'price', 'quantity', 'currency', 'unit']:
-                available_fields.append(str(value))
-        
-        if available_fields:
-            return " ".join(available_fields[:3])  # Use first 3 meaningful fields
+    async def _call_keepa_api(self, search_term: str) -> Dict[str, Any]:
+        """Look up a search term, sharing cached and in-flight results between identical terms."""
+        cached = self._result_cache.get(search_term)
+        if cached is not None:
+            cached_at, result = cached
+            if time.monotonic() - cached_at < KEEPA_RESULT_CACHE_TTL_SECONDS:
+                return dict(result)
+            del self._result_cache[search_term]
         
-        # Last resort
-        return f"Product {hash(str(item_data)) % 1000000}"
+        task = self._in_flight.get(search_term)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(search_term))
+            self._in_flight[search_term] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(search_term, None))
+        return dict(await asyncio.shield(task))
     
-    async def _call_keepa_api(self, search_term: str) -> Dict[str, Any]:
+    async def _fetch_and_cache(self, search_term: str) -> Dict[str, Any]:
+        result = await self._fetch_keepa_data(search_term)
+        # Mock fallbacks are not cached so a later call can still get real data
+        if result.get("keepa_status") == "real_data":
+            # Re-insert rather than overwrite, so insertion order stays oldest-first for eviction
+            self._result_cache.pop(search_term, None)
+            if len(self._result_cache) >= KEEPA_RESULT_CACHE_SIZE:
+                self._result_cache.pop(next(iter(self._result_cache)))
+            self._result_cache[search_term] = (time.monotonic(), result)
+        return result
+    
+    async def _fetch_keepa_data(self, search_term: str) -> Dict[str, Any]:
         """Call Keepa API to get product information including images."""
-        logger.info(f"Keepa API - Starting API call for search term: '{search_term}'")
-        logger.info(f"Keepa API - API key configured: {'Yes' if self.api_key else 'No'}")
+        logger.debug("Keepa API - Starting API call for search term: '%s'", search_term)
         
         if not self.api_key:
             logger.error("Keepa API - No API key configured, falling back to mock data")
             raise Exception("Keepa API key not configured")
         
         try:
-            # Make real Keepa API call
-            async with httpx.AsyncClient() as client:
-                # Search for products using the search term
-                search_url = f"{self.base_url}/search"
-                params = {
-                    "key": self.api_key,
-                    "q": search_term,
-                    "domain": 1,  # 1 = US, 2 = UK, 3 = DE, etc.
-                    "excludeCategories": "0",  # Include all categories
-                    "titleSearch": 1,  # Search in titles
-                    "productType": 1,  # All product types
-                    "limit": 5  # Limit results for better performance
-                }
-                
-                logger.info(f"Keepa API - Making search request to: {search_url}")
-                logger.info(f"Keepa API - Search params: {params}")
-                
-                response = await client.get(search_url, params=params, timeout=30.0)
-                response.raise_for_status()
-                
-                search_data = response.json()
-                logger.info(f"Keepa API - Search response status: {response.status_code}")
-                logger.info(f"Keepa API - Search response keys: {list(search_data.keys())}")
-                logger.info(f"Keepa API - Products found: {len(search_data.get('products', []))}")
-                
-                if not search_data.get("products") or len(search_data["products"]) == 0:
-                    # Fallback to mock data if no results
-                    logger.warning(f"Keepa API - No search results for '{search_term}', using mock data")
-                    return self._get_mock_keepa_data(search_term)
-                
-                # Get the first (most relevant) product
-                product = search_data["products"][0]
-                product_id = product.get("asin")
-                
-                # Get detailed product information including images
-                product_url = f"{self.base_url}/product"
-                product_params = {
-                    "key": self.api_key,
-                    "asin": product_id,
-                    "domain": 1,
-                    "history": 0,  # No price history needed for images
-                    "offers": 0,  # No offers needed for images
-                    "update": 0,  # No updates needed for images
-                    "rating": 1,  # Include rating
-                    "review": 1,  # Include review count
-                    "images": 1   # Include images
-                }
-                
-                logger.info(f"Keepa API - Making product detail request to: {product_url}")
-                logger.info(f"Keepa API - Product params: {product_params}")
-                
-                product_response = await client.get(product_url, params=product_params, timeout=30.0)
-                product_response.raise_for_status()
-                
-                product_data = product_response.json()
-                logger.info(f"Keepa API - Product detail response status: {product_response.status_code}")
-                logger.info(f"Keepa API - Product detail response keys: {list(product_data.keys())}")
-                logger.info(f"Keepa API - Products in detail response: {len(product_data.get('products', []))}")
-                
-                if not product_data.get("products") or len(product_data["products"]) == 0:
-                    logger.warning(f"Keepa API - No product detail results for ASIN {product_id}, using mock data")
-                    return self._get_mock_keepa_data(search_term)
-                
-                detailed_product = product_data["products"][0]
-                
-                # Extract image information
-                images = []
-                main_image = None
-                
-                # Log the raw Keepa product data for debugging
-                logger.info(f"Keepa API - Raw product data keys: {list(detailed_product.keys())}")
-                logger.info(f"Keepa API - imagesCSV field: {detailed_product.get('imagesCSV')}")
-                logger.info(f"Keepa API - title: {detailed_product.get('title')}")
-                logger.info(f"Keepa API - brand: {detailed_product.get('brand')}")
-                
-                if detailed_product.get("imagesCSV"):
-                    image_urls = detailed_product["imagesCSV"].split(",")
-                    images = [f"https://m.media-amazon.com/images/I/{img_id}.jpg" for img_id in image_urls if img_id]
-                    if images:
-                        main_image = images[0]  # First image is usually the main one
-                        logger.info(f"Keepa API - Extracted {len(images)} images, main: {main_image[:50]}...")
-                    else:
-                        logger.warning(f"Keepa API - No valid image IDs found in imagesCSV: {detailed_product['imagesCSV']}")
-                else:
-                    logger.warning(f"Keepa API - No imagesCSV field found in product data")
-                
-                # Build the response data
-                response_data = {
-                    "keepa_product_id": product_id,
-                    "keepa_price": self._extract_keepa_price(detailed_product),
-                    "keepa_rating": detailed_product.get("rating", 0.0),
-                    "keepa_review_count": detailed_product.get("reviewCount", 0),
-                    "keepa_category": self._extract_keepa_category(detailed_product),
-                    "keepa_brand": detailed_product.get("brand", "Unknown Brand"),
-                    "keepa_features": detailed_product.get("features", []),
-                    "keepa_images": images,
-                    "keepa_main_image": main_image,
-                    "keepa_url": f"https://keepa.com/product.html#1!{product_id}",
-                    "keepa_search_term": search_term,
-                    "keepa_status": "real_data",
-                    "keepa_title": detailed_product.get("title", search_term),
-                    "keepa_manufacturer": detailed_product.get("manufacturer", "Unknown Manufacturer"),
-                    "keepa_mpn": detailed_product.get("mpn", ""),
-                    "keepa_upc": detailed_product.get("upc", ""),
-                    "keepa_ean": detailed_product.get("ean", "")
-                }
-                
-                logger.info(f"Keepa API - Final response data keys: {list(response_data.keys())}")
-                logger.info(f"Keepa API - keepa_main_image: {response_data['keepa_main_image']}")
-                logger.info(f"Keepa API - keepa_images count: {len(response_data['keepa_images']) if response_data['keepa_images'] else 0}")
-                
-                return response_data
-                
+            product_id = await self._resolve_asin(search_term)
+            if not product_id:
+                # Fallback to mock data if no results
+                logger.warning(f"Keepa API - No search results for '{search_term}', using mock data")
+                return self._get_mock_keepa_data(search_term)
+            
+            # Product details are fetched in shared multi-ASIN batches
+            detailed_product = await asyncio.shield(self._fetch_product(product_id))
+            if not detailed_product:
+                logger.warning(f"Keepa API - No product detail results for ASIN {product_id}, using mock data")
+                return self._get_mock_keepa_data(search_term)
+            
+            return self._build_keepa_data(search_term, product_id, detailed_product)
+            
         except httpx.RequestError as e:
             logger.error(f"Keepa API request error for '{search_term}': {e}")
             return self._get_mock_keepa_data(search_term)
@@ -315,19 +395,151 @@ class KeepaAPIProvider(EnrichmentProvider):
             logger.error(f"Keepa API error for search term '{search_term}': {e}")
             return self._get_mock_keepa_data(search_term)
     
+    async def _resolve_asin(self, search_term: str) -> Optional[str]:
+        """Search Keepa and return the ASIN of the most relevant product, if any."""
+        search_url = f"{self.base_url}/search"
+        params = {
+            "key": self.api_key,
+            "q": search_term,
+            "domain": 1,  # 1 = US, 2 = UK, 3 = DE, etc.
+            "excludeCategories": "0",  # Include all categories
+            "titleSearch": 1,  # Search in titles
+            "productType": 1,  # All product types
+            "limit": 5  # Limit results for better performance
+        }
+        
+        logger.debug("Keepa API - Making search request to: %s", search_url)
+        
+        response = await self._get_with_retry(search_url, params)
+        response.raise_for_status()
+        
+        search_data = orjson.loads(response.content)
+        self._record_tokens(search_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Keepa API - Search response status: %s, products found: %s",
+                         response.status_code, len(search_data.get("products") or []))
+        
+        if not search_data.get("products"):
+            return None
+        
+        # Take the first (most relevant) product
+        return search_data["products"][0].get("asin")
+    
+    def _fetch_product(self, asin: str) -> asyncio.Future:
+        """Queue an ASIN for the next batched /product call; the future resolves to its product or None."""
+        loop = asyncio.get_running_loop()
+        future = self._pending_products.get(asin)
+        if future is None:
+            future = loop.create_future()
+            self._pending_products[asin] = future
+            if len(self._pending_products) >= KEEPA_PRODUCT_BATCH_SIZE:
+                self._flush_products()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(KEEPA_PRODUCT_BATCH_WINDOW_SECONDS, self._flush_products)
+        return future
+    
+    def _flush_products(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending_products = self._pending_products, {}
+        if batch:
+            task = asyncio.create_task(self._resolve_product_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _resolve_product_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            products = await self._fetch_products(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for asin, future in batch.items():
+            if not future.done():
+                future.set_result(products.get(asin))
+    
+    async def _fetch_products(self, asins: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch product details for up to KEEPA_PRODUCT_BATCH_SIZE ASINs in one call, keyed by ASIN."""
+        product_url = f"{self.base_url}/product"
+        product_params = {
+            "key": self.api_key,
+            "asin": ",".join(asins),
+            "domain": 1,
+            "history": 0,  # No price history needed for images
+            "offers": 0,  # No offers needed for images
+            "update": 0,  # No updates needed for images
+            "rating": 1,  # Include rating
+            "review": 1,  # Include review count
+            "images": 1   # Include images
+        }
+        
+        logger.debug("Keepa API - Making product detail request for %d ASINs to: %s", len(asins), product_url)
+        
+        product_response = await self._get_with_retry(product_url, product_params)
+        product_response.raise_for_status()
+        
+        product_data = orjson.loads(product_response.content)
+        self._record_tokens(product_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Keepa API - Product detail response status: %s, products: %s",
+                         product_response.status_code, len(product_data.get("products") or []))
+        
+        return {product["asin"]: product for product in product_data.get("products") or [] if product.get("asin")}
+    
+    def _build_keepa_data(self, search_term: str, product_id: str, detailed_product: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a Keepa product record to the enrichment fields stored on products."""
+        # Extract image information
+        images = []
+        main_image = None
+        
+        if detailed_product.get("imagesCSV"):
+            image_urls = detailed_product["imagesCSV"].split(",")
+            images = [f"https://m.media-amazon.com/images/I/{img_id}.jpg" for img_id in image_urls if img_id]
+            if images:
+                main_image = images[0]  # First image is usually the main one
+                logger.debug("Keepa API - Extracted %d images for %s", len(images), product_id)
+            else:
+                logger.warning(f"Keepa API - No valid image IDs found in imagesCSV: {detailed_product['imagesCSV']}")
+        else:
+            logger.warning(f"Keepa API - No imagesCSV field found in product data")
+        
+        # Build the response data
+        response_data = {
+            "keepa_product_id": product_id,
+            "keepa_price": self._extract_keepa_price(detailed_product),
+            "keepa_rating": detailed_product.get("rating", 0.0),
+            "keepa_review_count": detailed_product.get("reviewCount", 0),
+            "keepa_category": self._extract_keepa_category(detailed_product),
+            "keepa_brand": detailed_product.get("brand", "Unknown Brand"),
+            "keepa_features": detailed_product.get("features", []),
+            "keepa_images": images,
+            "keepa_main_image": main_image,
+            "keepa_url": f"https://keepa.com/product.html#1!{product_id}",
+            "keepa_search_term": search_term,
+            "keepa_status": "real_data",
+            "keepa_title": detailed_product.get("title", search_term),
+            "keepa_manufacturer": detailed_product.get("manufacturer", "Unknown Manufacturer"),
+            "keepa_mpn": detailed_product.get("mpn", ""),
+            "keepa_upc": detailed_product.get("upc", ""),
+            "keepa_ean": detailed_product.get("ean", "")
+        }
+        
+        return response_data
+    
     def _get_mock_keepa_data(self, search_term: str) -> Dict[str, Any]:
         """Return mock Keepa data as fallback."""
-        logger.info(f"Using mock Keepa data for: {search_term}")
+        logger.debug("Using mock Keepa data for: %s", search_term)
+        
+        term_hash = hash(search_term)
+        image_id = term_hash % 100000000
         
         # Generate realistic mock images based on search term
-        mock_images = [
-            f"https://m.media-amazon.com/images/I/71{hash(search_term) % 100000000}L._AC_SL1500_.jpg",
-            f"https://m.media-amazon.com/images/I/71{hash(search_term) % 100000000}L._AC_SL1500_2_.jpg",
-            f"https://m.media-amazon.com/images/I/71{hash(search_term) % 100000000}L._AC_SL1500_3_.jpg"
-        ]
+        mock_images = [_MOCK_KEEPA_IMAGE_URL.format(image_id, suffix) for suffix in _MOCK_KEEPA_IMAGE_SUFFIXES]
         
         return {
-            "keepa_product_id": f"KPA_{hash(search_term) % 1000000}",
+            "keepa_product_id": f"KPA_{term_hash % 1000000}",
             "keepa_price": 89.99,
             "keepa_rating": 4.3,
             "keepa_review_count": 980,
@@ -336,14 +548,14 @@ class KeepaAPIProvider(EnrichmentProvider):
             "keepa_features": ["Portable", "Rechargeable", "Fast Charging"],
             "keepa_images": mock_images,
             "keepa_main_image": mock_images[0],
-            "keepa_url": f"https://keepa.com/product/{hash(search_term) % 1000000}",
+            "keepa_url": f"https://keepa.com/product/{term_hash % 1000000}",
             "keepa_search_term": search_term,
             "keepa_status": "mock_data",
             "keepa_title": f"Mock {search_term}",
             "keepa_manufacturer": "Mock Manufacturer",
-            "keepa_mpn": f"MPN_{hash(search_term) % 10000}",
-            "keepa_upc": f"UPC_{hash(search_term) % 100000000000}",
-            "keepa_ean": f"EAN_{hash(search_term) % 1000000000000}"
+            "keepa_mpn": f"MPN_{term_hash % 10000}",
+            "keepa_upc": f"UPC_{term_hash % 100000000000}",
+            "keepa_ean": f"EAN_{term_hash % 1000000000000}"
         }
     
     def _extract_keepa_price(self, product: Dict[str, Any]) -> Optional[float]:
@@ -391,103 +603,157 @@ class LocalEnrichmentService:
             self._db = get_database()
         return self._db
     
+    async def aclose(self):
+        """Close provider resources such as pooled HTTP clients."""
+        for provider in self.providers.values():
+            await provider.aclose()
+    
     async def enrich_catalog(
         self, 
         catalog_id: str, 
         user_id: str, 
-        provider: str = "amazon",
-        batch_size: int = 10
+        provider: Union[str, List[str]] = "amazon"
     ) -> Dict[str, Any]:
-        """Enrich all items in a catalog using the specified provider."""
+        """Enrich all items in a catalog using the specified provider(s); multiple providers run concurrently per item."""
+        # Parsed once here and shared by every product document
+        catalog_oid = ObjectId(catalog_id)
+        user_oid = ObjectId(user_id)
         try:
             # Validate provider
-            if provider not in self.providers:
-                raise ValueError(f"Unknown provider: {provider}. Available: {list(self.providers.keys())}")
+            providers = [provider] if isinstance(provider, str) else list(provider)
+            if not providers:
+                raise ValueError("At least one provider is required")
+            for name in providers:
+                if name not in self.providers:
+                    raise ValueError(f"Unknown provider: {name}. Available: {list(self.providers.keys())}")
             
             # Get catalog
             catalog = await self.db.catalogs.find_one({
-                "_id": ObjectId(catalog_id),
-                "user_id": ObjectId(user_id)
+                "_id": catalog_oid,
+                "user_id": user_oid
             })
             
             if not catalog:
                 raise ValueError("Catalog not found")
             
-            # Get catalog file from S3 or local storage
-            # For now, we'll simulate line items
-            line_items = await self._get_catalog_line_items(catalog)
+            # Rows are streamed from the catalog file rather than collected into one list
+            line_items = self._iter_catalog_line_items(catalog)
+            first_item = await anext(line_items, None)
             
-            if not line_items:
+            if first_item is None:
                 raise ValueError("No line items found in catalog")
             
             # Update catalog status
+            started_at = _now()
             await self.db.catalogs.update_one(
-                {"_id": ObjectId(catalog_id)},
+                {"_id": catalog_oid},
                 {
                     "$set": {
                         "status": "processing",
-                        "enrichment_started_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
+                        "enrichment_started_at": started_at,
+                        "updated_at": started_at
                     }
                 }
             )
             
-            # Process items in batches
-            total_items = len(line_items)
+            total_items = 0
             enriched_count = 0
             failed_count = 0
+            done_count = 0
+            # Three stages joined by bounded queues: file rows -> enrichment workers -> product writer
+            queue: asyncio.Queue = asyncio.Queue(maxsize=2 * ENRICHMENT_WORKERS)
+            write_queue: asyncio.Queue = asyncio.Queue(maxsize=PRODUCT_INSERT_BATCH_SIZE)
             
-            for i in range(0, total_items, batch_size):
-                batch = line_items[i:i + batch_size]
-                
-                # Process batch concurrently
-                tasks = [
-                    self._enrich_single_item(
+            async def worker():
+                nonlocal enriched_count, failed_count, done_count
+                while True:
+                    queued = await queue.get()
+                    if queued is None:
+                        return
+                    index, item = queued
+                    result, product = await self._enrich_single_item(
                         item, 
-                        catalog_id, 
-                        user_id, 
-                        provider,
-                        index=i + j
+                        catalog_oid, 
+                        user_oid, 
+                        providers,
+                        index=index
                     )
-                    for j, item in enumerate(batch)
-                ]
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Count results
-                for result in results:
-                    if isinstance(result, Exception):
-                        failed_count += 1
-                        logger.error(f"Item enrichment failed: {result}")
+                    if result.get("enrichment_status") == "completed":
+                        enriched_count += 1
                     else:
-                        if result.get("enrichment_status") == "completed":
-                            enriched_count += 1
-                        else:
-                            failed_count += 1
-                
-                # Update progress
-                await self.db.catalogs.update_one(
-                    {"_id": ObjectId(catalog_id)},
-                    {
-                        "$set": {
-                            "enriched_items": enriched_count,
-                            "updated_at": datetime.utcnow()
-                        }
-                    }
-                )
-                
-                logger.info(f"Processed batch {i//batch_size + 1}, enriched: {enriched_count}, failed: {failed_count}")
+                        failed_count += 1
+                    done_count += 1
+                    
+                    if product is not None:
+                        await write_queue.put(product)
+            
+            async def enrich():
+                await asyncio.gather(*(worker() for _ in range(ENRICHMENT_WORKERS)))
+                await write_queue.put(None)
+            
+            async def writer():
+                # Inserts run here, so enrichment keeps going while a batch is being written
+                batch: List[Dict[str, Any]] = []
+                while True:
+                    product = await write_queue.get()
+                    if product is None:
+                        break
+                    batch.append(product)
+                    if len(batch) >= PRODUCT_INSERT_BATCH_SIZE:
+                        await self._insert_products(batch)
+                        batch = []
+                await self._insert_products(batch)
+            
+            # Progress is advisory, so it skips the journal wait; the final status update below stays durable
+            progress_catalogs = self.db.catalogs.with_options(write_concern=WriteConcern(w=1, j=False))
+            
+            async def report_progress():
+                while True:
+                    await asyncio.sleep(ENRICHMENT_PROGRESS_INTERVAL_SECONDS)
+                    try:
+                        # A cancelled write can still land after the final status update; $max keeps it from going backwards
+                        await progress_catalogs.update_one(
+                            {"_id": catalog_oid},
+                            {
+                                "$max": {"enriched_items": enriched_count},
+                                "$set": {"updated_at": _now()}
+                            }
+                        )
+                    except PyMongoError as e:
+                        logger.warning(f"Failed to write enrichment progress for catalog {catalog_id}: {e}")
+                    logger.info(f"Processed {done_count} items, enriched: {enriched_count}, failed: {failed_count}")
+            
+            async def producer():
+                nonlocal total_items
+                await queue.put((0, first_item))
+                total_items = 1
+                async for item in line_items:
+                    await queue.put((total_items, item))
+                    total_items += 1
+                for _ in range(ENRICHMENT_WORKERS):
+                    await queue.put(None)
+            
+            progress_task = asyncio.create_task(report_progress())
+            try:
+                # A failure in any stage cancels the others, so nothing waits on a full queue
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(producer())
+                    group.create_task(enrich())
+                    group.create_task(writer())
+            finally:
+                progress_task.cancel()
             
             # Update final status
             final_status = "completed" if failed_count == 0 else "partially_completed"
+            completed_at = _now()
             await self.db.catalogs.update_one(
-                {"_id": ObjectId(catalog_id)},
+                {"_id": catalog_oid},
                 {
                     "$set": {
                         "status": final_status,
                         "enriched_items": enriched_count,
-                        "enrichment_completed_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
+                        "enrichment_completed_at": completed_at,
+                        "updated_at": completed_at
                     }
                 }
             )
@@ -505,11 +771,11 @@ class LocalEnrichmentService:
             logger.error(f"Catalog enrichment failed: {e}")
             # Update catalog status to error
             await self.db.catalogs.update_one(
-                {"_id": ObjectId(catalog_id)},
+                {"_id": catalog_oid},
                 {
                     "$set": {
                         "status": "error",
-                        "updated_at": datetime.utcnow()
+                        "updated_at": _now()
                     }
                 }
             )
@@ -518,59 +784,54 @@ class LocalEnrichmentService:
     async def _enrich_single_item(
         self, 
         item_data: Dict[str, Any], 
-        catalog_id: str, 
-        user_id: str, 
-        provider: str,
+        catalog_id: ObjectId, 
+        user_id: ObjectId, 
+        providers: List[str],
         index: int
-    ) -> Dict[str, Any]:
-        """Enrich a single item and save to database."""
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Enrich a single item; returns the enrichment result and its product document (None on failure)."""
         try:
-            # Get the provider
-            enrichment_provider = self.providers[provider]
-            
-            # Enrich the item
-            enrichment_result = await enrichment_provider.enrich_item(item_data)
+            # Enrich the item with every requested provider at once
+            results = await asyncio.gather(
+                *(self.providers[name].enrich_item(item_data) for name in providers)
+            )
+            enrichment_result = results[0] if len(results) == 1 else self._merge_enrichment_results(results)
             
             # Create product record with flexible field mapping
             # Map Excel columns to product fields
             
-            # Debug logging for enrichment result
-            logger.info(f"Debug: Enrichment result structure: {enrichment_result}")
-            logger.info(f"Debug: Enrichment result keys: {list(enrichment_result.keys())}")
-            if 'enriched_data' in enrichment_result:
-                logger.info(f"Debug: Enriched data keys: {list(enrichment_result['enriched_data'].keys())}")
-                logger.info(f"Debug: Looking for keepa_main_image: {enrichment_result['enriched_data'].get('keepa_main_image')}")
-                logger.info(f"Debug: Looking for keepa_images: {enrichment_result['enriched_data'].get('keepa_images')}")
-            
-            # Extract image fields from enrichment based on provider
-            enrichment_source = enrichment_result.get("enrichment_source", "")
-            if "keepa" in enrichment_source.lower():
-                # Keepa provider
-                main_image = self._extract_image_from_enrichment(enrichment_result, "keepa_main_image")
-                images = self._extract_images_from_enrichment(enrichment_result, "keepa_images")
-            elif "amazon" in enrichment_source.lower():
-                # Amazon provider
-                main_image = self._extract_image_from_enrichment(enrichment_result, "amazon_images")
-                images = self._extract_images_from_enrichment(enrichment_result, "amazon_images")
-            else:
-                # Unknown provider, try both
-                main_image = self._extract_image_from_enrichment(enrichment_result, "keepa_main_image") or self._extract_image_from_enrichment(enrichment_result, "amazon_images")
-                images = self._extract_images_from_enrichment(enrichment_result, "keepa_images") or self._extract_images_from_enrichment(enrichment_result, "amazon_images")
+            # Extract image fields from each provider's own result, in provider order
+            main_image = None
+            images = None
+            for result in results:
+                image_fields = _IMAGE_FIELDS.get(result.get("enrichment_source"))
+                if not image_fields:
+                    continue
+                if main_image is None:
+                    candidate = self._extract_image_from_enrichment(result, image_fields[0])
+                    # Amazon only reports an image list; its first entry is the main image
+                    if isinstance(candidate, list):
+                        candidate = candidate[0] if candidate else None
+                    if isinstance(candidate, str) and candidate:
+                        main_image = candidate
+                if images is None:
+                    images = self._extract_images_from_enrichment(result, image_fields[1])
             
+            now = _now()
             product_data = {
-                "catalog_id": ObjectId(catalog_id),
-                "user_id": ObjectId(user_id),
+                "catalog_id": catalog_id,
+                "user_id": user_id,
                 "line_item_id": f"item_{index}",
-                "name": self._extract_field_value(item_data, ["Style Name", "name", "product_name", "item_name", "title", "product_title"], f"Item {index}"),
+                "name": self._extract_field_value(item_data, _NAME_KEYS, f"Item {index}"),
                 "description": self._create_description_from_excel(item_data),
-                "category": self._extract_field_value(item_data, ["Category", "Subcategory", "Division", "category", "product_category", "item_category", "type", "product_type"]),
-                "brand": self._extract_field_value(item_data, ["brand", "product_brand", "item_brand", "manufacturer", "make"]),
-                "sku": self._extract_field_value(item_data, ["SKU", "sku", "product_sku", "item_sku", "product_code", "item_code"]),
-                "upc": self._extract_field_value(item_data, ["UPC", "upc", "product_upc", "item_upc", "barcode", "ean"]),
-                "price": self._extract_numeric_field(item_data, ["Offer Price", "Wholesale", "RRP", "price", "product_price", "item_price", "cost", "unit_price"]),
-                "currency": self._extract_field_value(item_data, ["Currency", "currency", "product_currency", "item_currency"], "USD"),
-                "quantity": self._extract_numeric_field(item_data, ["Quantity Available", "quantity", "product_quantity", "item_quantity", "qty", "stock"]),
-                "unit": self._extract_field_value(item_data, ["unit", "product_unit", "item_unit", "uom", "measurement_unit"], "piece"),
+                "category": self._extract_field_value(item_data, _CATEGORY_KEYS),
+                "brand": self._extract_field_value(item_data, _BRAND_KEYS),
+                "sku": self._extract_field_value(item_data, _SKU_KEYS),
+                "upc": self._extract_field_value(item_data, _UPC_KEYS),
+                "price": self._extract_numeric_field(item_data, _PRICE_KEYS),
+                "currency": self._extract_field_value(item_data, _CURRENCY_KEYS, "USD"),
+                "quantity": self._extract_numeric_field(item_data, _QUANTITY_KEYS),
+                "unit": self._extract_field_value(item_data, _UNIT_KEYS, "piece"),
                 "original_data": item_data,
                 # Add image fields from enrichment
                 "main_image": main_image,
@@ -580,47 +841,87 @@ class LocalEnrichmentService:
                 "enrichment_status": enrichment_result.get("enrichment_status"),
                 "enrichment_errors": enrichment_result.get("enrichment_errors", []),
                 "enriched_at": enrichment_result.get("enriched_at"),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
             
-            # Save to database
-            await self.db.products.insert_one(product_data)
-            
-            return enrichment_result
+            return enrichment_result, product_data
             
         except Exception as e:
             logger.error(f"Failed to enrich item {index}: {e}")
             return {
                 "enrichment_status": "failed",
                 "enrichment_errors": [str(e)]
-            }
+            }, None
     
-    async def _get_catalog_line_items(self, catalog: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Get line items from catalog file."""
+    def _merge_enrichment_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-provider results into one; the item counts as completed only if every provider completed."""
+        enriched_data: Dict[str, Any] = {}
+        errors: List[str] = []
+        for result in results:
+            enriched_data.update(result.get("enriched_data") or {})
+            errors.extend(result.get("enrichment_errors") or [])
+        return {
+            "enrichment_source": ",".join(result["enrichment_source"] for result in results),
+            "enrichment_status": "completed" if all(
+                result.get("enrichment_status") == "completed" for result in results
+            ) else "failed",
+            "enriched_data": enriched_data,
+            "enrichment_errors": errors,
+            "enriched_at": max(result["enriched_at"] for result in results)
+        }
+    
+    async def _insert_products(self, products: List[Dict[str, Any]]):
+        """Bulk-insert product documents, chunked and unordered so one bad document doesn't stop the rest."""
+        if not products:
+            return
+        chunks = [
+            products[i:i + PRODUCT_INSERT_BATCH_SIZE]
+            for i in range(0, len(products), PRODUCT_INSERT_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(self.db.products.insert_many(chunk, ordered=False) for chunk in chunks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BulkWriteError):
+                logger.error(f"Failed to insert {len(result.details.get('writeErrors', []))} products: {result}")
+            elif isinstance(result, Exception):
+                logger.error(f"Failed to insert products: {result}")
+    
+    async def _iter_catalog_line_items(self, catalog: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield line items from the catalog file one row at a time."""
         try:
-            # Get the file from S3
-            file_data = await aws_service.get_file_from_s3(catalog["file_path"])
-            if not file_data:
+            # Stream the file from S3 instead of holding the whole object as bytes
+            file_obj = await aws_service.download_file_from_s3(catalog["file_path"])
+            if file_obj is None:
                 raise Exception("Failed to retrieve catalog file from S3")
             
             # Parse the file based on its type
             file_name = catalog["file_name"]
             
-            if file_name.lower().endswith('.csv'):
-                return await self._parse_csv_file(file_data)
-            elif file_name.lower().endswith('.json'):
-                return await self._parse_json_file(file_data)
-            elif file_name.lower().endswith('.xlsx') or file_name.lower().endswith('.xls'):
-                return await self._parse_excel_file(file_data)
-            else:
-                raise ValueError(f"Unsupported file format: {file_name}")
+            with file_obj:
+                # Parsing is CPU-bound; run it in a worker thread so the event loop keeps serving
+                rows = await asyncio.to_thread(self._parse_line_items, file_obj, file_name)
                 
         except Exception as e:
             logger.error(f"Error getting catalog line items: {e}")
             # Fallback to mock data for testing
             logger.warning("Falling back to mock data due to file parsing error")
-            return self._get_mock_line_items()
+            rows = iter(self._get_mock_line_items())
+        
+        for row in rows:
+            yield row
+    
+    def _parse_line_items(self, file_obj: BinaryIO, file_name: str) -> Iterator[Dict[str, Any]]:
+        if file_name.lower().endswith('.csv'):
+            return self._parse_csv_file(file_obj)
+        elif file_name.lower().endswith('.json'):
+            return self._parse_json_file(file_obj)
+        elif file_name.lower().endswith('.xlsx') or file_name.lower().endswith('.xls'):
+            return self._parse_excel_file(file_obj)
+        else:
+            raise ValueError(f"Unsupported file format: {file_name}")
     
     def _get_mock_line_items(self) -> List[Dict[str, Any]]:
         """Fallback mock data for testing."""
@@ -660,80 +961,81 @@ class LocalEnrichmentService:
             }
         ]
     
-    async def _parse_csv_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    def _parse_csv_file(self, file_data: BinaryIO) -> Iterator[Dict[str, Any]]:
         """Parse CSV file and return line items."""
         try:
             import csv
             import io
             
-            text = file_data.decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(text))
-            return [dict(row) for row in csv_reader]
+            import polars as pl
+            
+            # Polars' native reader, with type inference off, yields the same all-string rows
+            # as csv.DictReader; ragged or empty files fall back to the csv module below.
+            # Polars reads blank lines as all-empty rows, so those are dropped (in both paths)
+            try:
+                df = pl.read_csv(file_data, infer_schema=False, empty_string_is_null=False)
+                # The frame stays columnar; rows become dicts only as they are consumed
+                return df.filter(pl.any_horizontal(pl.all().fill_null("") != "")).iter_rows(named=True)
+            except pl.exceptions.PolarsError as e:
+                logger.warning(f"Falling back to csv module for CSV parsing: {e}")
+                file_data.seek(0)
+            
+            # Decode incrementally instead of materializing the whole file as one string
+            text = io.TextIOWrapper(file_data, encoding='utf-8', newline='')
+            try:
+                return iter([dict(row) for row in csv.DictReader(text) if any(row.values())])
+            finally:
+                # Detach so the wrapper doesn't close the caller's file
+                text.detach()
         except Exception as e:
             logger.error(f"Error parsing CSV file: {e}")
             raise Exception(f"Failed to parse CSV file: {e}")
     
-    async def _parse_json_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    def _parse_json_file(self, file_data: BinaryIO) -> Iterator[Dict[str, Any]]:
         """Parse JSON file and return line items."""
         try:
-            import json
-            
-            text = file_data.decode('utf-8')
-            data = json.loads(text)
+            # orjson parses the raw bytes directly, without a separate utf-8 decode pass
+            data = orjson.loads(file_data.read())
             # Assume JSON is an array of line items or has a 'items' key
             if isinstance(data, list):
-                return data
+                return iter(data)
             elif isinstance(data, dict) and 'items' in data:
-                return data['items']
+                return iter(data['items'])
             else:
                 raise ValueError("Invalid JSON format: expected array or object with 'items' key")
         except Exception as e:
             logger.error(f"Error parsing JSON file: {e}")
             raise Exception(f"Failed to parse JSON file: {e}")
     
-    async def _parse_excel_file(self, file_data: bytes) -> List[Dict[str, Any]]:
+    def _parse_excel_file(self, file_data: BinaryIO) -> Iterator[Dict[str, Any]]:
         """Parse Excel file and return line items."""
         try:
             import pandas as pd
-            import io
             
-            # Read Excel file using pandas
-            excel_data = io.BytesIO(file_data)
+            # Read the first sheet with calamine (Rust), much faster than the default openpyxl
+            df = pd.read_excel(file_data, sheet_name=0, engine="calamine")
             
-            # Try to read the first sheet
-            df = pd.read_excel(excel_data, sheet_name=0)
+            # Object dtype yields Python scalars and NaN cells become None; rows become dicts
+            # only as they are consumed
+            df = df.astype(object).where(df.notna(), None)
+            columns = list(df.columns)
             
-            # Convert DataFrame to list of dictionaries
-            line_items = []
-            for _, row in df.iterrows():
-                # Convert pandas Series to dict, handling NaN values
-                item = {}
-                for column, value in row.items():
-                    if pd.isna(value):
-                        item[column] = None
-                    else:
-                        # Convert numpy types to Python types
-                        if hasattr(value, 'item'):
-                            item[column] = value.item()
-                        else:
-                            item[column] = value
-                line_items.append(item)
-            
-            logger.info(f"Successfully parsed Excel file with {len(line_items)} items")
-            return line_items
+            logger.info(f"Successfully parsed Excel file with {len(df)} items")
+            return (dict(zip(columns, row)) for row in df.itertuples(index=False, name=None))
             
         except Exception as e:
             logger.error(f"Error parsing Excel file: {e}")
             raise Exception(f"Failed to parse Excel file: {e}")
     
-    def _extract_field_value(self, item_data: Dict[str, Any], field_names: List[str], default: Any = None) -> Any:
+    def _extract_field_value(self, item_data: Dict[str, Any], field_names: Sequence[str], default: Any = None) -> Any:
         """Extract field value from item data using multiple possible field names."""
         for field in field_names:
-            if item_data.get(field):
-                return item_data[field]
+            value = item_data.get(field)
+            if value:
+                return value
         return default
     
-    def _extract_numeric_field(self, item_data: Dict[str, Any], field_names: List[str]) -> Optional[float]:
+    def _extract_numeric_field(self, item_data: Dict[str, Any], field_names: Sequence[str]) -> Optional[float]:
         """Extract numeric field value from item data."""
         for field in field_names:
             value = item_data.get(field)
@@ -793,12 +1095,8 @@ class LocalEnrichmentService:
             enriched_data = enrichment_result.get("enriched_data", {})
             image_url = enriched_data.get(field_name)
             
-            # Debug logging
-            if image_url:
-                logger.info(f"Found main image: {image_url[:50]}...")
-            else:
-                logger.warning(f"No main image found for field: {field_name}")
-                logger.debug(f"Available fields in enriched_data: {list(enriched_data.keys())}")
+            if not image_url:
+                logger.debug("No main image found for field: %s", field_name)
             
             return image_url
         except Exception as e:
@@ -811,13 +1109,8 @@ class LocalEnrichmentService:
             enriched_data = enrichment_result.get("enriched_data", {})
             images = enriched_data.get(field_name, [])
             
-            # Debug logging
-            if images and isinstance(images, list):
-                logger.info(f"Found {len(images)} images")
-                logger.debug(f"First image: {images[0][:50] if images[0] else 'None'}...")
-            else:
-                logger.warning(f"No images found for field: {field_name}")
-                logger.debug(f"Available fields in enriched_data: {list(enriched_data.keys())}")
+            if not (images and isinstance(images, list)):
+                logger.debug("No images found for field: %s", field_name)
             
             if isinstance(images, list) and images:
                 return images
@@ -65,7 +65,7 @@ class OfferService:
             # Save offers to database
             saved_offers = []
             for offer in offers:
-                offer_dict = offer.dict()
+                offer_dict = offer.model_dump()
                 offer_dict["_id"] = ObjectId()
                 result = await self.db.offers.insert_one(offer_dict)
                 offer_dict["_id"] = result.inserted_id
@@ -313,19 +313,23 @@ class OfferService:
         catalog_id: Optional[str] = None,
         offer_type: Optional[str] = None,
         limit: int = 100,
-        skip: int = 0
+        skip: int = 0,
+        after: Optional[str] = None
     ) -> List[Offer]:
-        """Get offers for a specific user."""
+        """Get offers for a specific user, oldest first; `after` resumes past that offer ID."""
         try:
             filter_query = {"user_id": ObjectId(user_id)}
             
+            if after:
+                filter_query["_id"] = {"$gt": ObjectId(after)}
+            
             if catalog_id:
                 filter_query["catalog_id"] = ObjectId(catalog_id)
             
             if offer_type:
                 filter_query["offer_type"] = offer_type
             
-            cursor = self.db.offers.find(filter_query).skip(skip).limit(limit)
+            cursor = self.db.offers.find(filter_query).sort("_id", 1).skip(skip).limit(limit)
             offers = []
             async for offer in cursor:
                 offers.append(Offer(**offer))
@@ -336,6 +340,26 @@ class OfferService:
             logger.error(f"Error fetching user offers: {e}")
             raise Exception(f"Failed to fetch offers: {e}")
     
+    async def get_offer_type_stats(self, user_id: str, catalog_id: str) -> List[Dict[str, Any]]:
+        """Per offer type count, savings, discount and best score for a catalog's offers."""
+        try:
+            pipeline = [
+                {"$match": {"user_id": ObjectId(user_id), "catalog_id": ObjectId(catalog_id)}},
+                {"$group": {
+                    "_id": "$offer_type",
+                    "count": {"$sum": 1},
+                    "total_savings": {"$sum": "$total_savings"},
+                    "total_discount": {"$sum": "$total_discount"},
+                    "best_score": {"$max": "$offer_score"}
+                }}
+            ]
+            cursor = await self.db.offers.aggregate(pipeline)
+            return await cursor.to_list(None)
+            
+        except Exception as e:
+            logger.error(f"Error aggregating offer stats: {e}")
+            raise Exception(f"Failed to aggregate offer stats: {e}")
+    
     async def get_offer_by_id(self, offer_id: str, user_id: str) -> Optional[Offer]:
         """Get a specific offer by ID."""
         try:
@@ -2,15 +2,20 @@
 """
 Startup script for Perfect PO API
 """
+import os
 import uvicorn
 from app.config import settings
 
 if __name__ == "__main__":
+    # Reload only works with a single worker; otherwise fan out across cores
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
         reload=settings.debug,
+        workers=1 if settings.debug else os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
 
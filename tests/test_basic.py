@@ -1,6 +1,15 @@
+import asyncio
+import io
 import pytest
+from unittest.mock import AsyncMock, MagicMock
 from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
 from app.main import app
+from app.database import Database
+from app.auth.dependencies import get_current_active_user
+from app.models.user import User
+from app.services.enrichment_service import KeepaAPIProvider, LocalEnrichmentService, KEEPA_RESULT_CACHE_TTL_SECONDS
 
 client = TestClient(app)
 
@@ -51,3 +60,208 @@ def test_catalog_endpoints_exist():
     assert "/catalogs/" in docs_content
 
 
+
+
+@pytest.mark.parametrize("workbook", ["ats.xlsx", "500_itemsexample.xlsx", "50_items_example.xlsx"])
+def test_catalog_profile_paths_agree(workbook):
+    """Test that streaming and DataFrame profiling report the same column statistics."""
+    from pathlib import Path
+    import analyze_catalog
+
+    file_path = str(Path(__file__).parent.parent / "app" / "catalog_examples" / workbook)
+    streamed = analyze_catalog._stream_column_stats(file_path, "calamine")
+    loaded = analyze_catalog._pandas_column_stats(file_path, "calamine")
+    for key in ("total_rows", "columns", "missing", "unique"):
+        assert streamed[key] == loaded[key]
+
+
+@pytest.mark.parametrize("key_pattern, detail", [
+    ({"email": 1}, "Email already registered"),
+    ({"username": 1}, "Username already taken"),
+])
+def test_register_duplicate_key(monkeypatch, key_pattern, detail):
+    """Test that a unique index violation on register maps to the matching 400 message."""
+    error = DuplicateKeyError("E11000 duplicate key error", 11000, {"keyPattern": key_pattern})
+    monkeypatch.setattr(Database, "users", MagicMock(insert_one=AsyncMock(side_effect=error)))
+    response = client.post("/auth/register", json={
+        "email": "user@example.com",
+        "username": "johndoe",
+        "full_name": "John Doe",
+        "password": "password123"
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+class _FakeCursor:
+    """Async cursor stand-in that records the query and returns preset documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.filter = None
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, count):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def batch_size(self, count):
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+@pytest.fixture
+def product_listing(monkeypatch):
+    """Serve /products/ for a fixed user from a fake products collection."""
+    user = User(email="user@example.com", username="johndoe", full_name="John Doe", hashed_password="x")
+    cursor = _FakeCursor([])
+
+    def find(filter_query, projection=None):
+        cursor.filter = filter_query
+        return cursor
+
+    monkeypatch.setattr("app.routers.products.get_database", lambda: MagicMock(products=MagicMock(find=find)))
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    yield cursor
+    app.dependency_overrides.pop(get_current_active_user, None)
+
+
+def _product_doc(product_id):
+    return {
+        "_id": product_id,
+        "catalog_id": ObjectId(),
+        "line_item_id": "item_0",
+        "name": "Item",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z"
+    }
+
+
+def test_products_after_cursor(product_listing):
+    """Test that a full page sets X-Next-Cursor and `after` becomes an _id range."""
+    ids = [ObjectId(), ObjectId()]
+    product_listing.documents = [_product_doc(product_id) for product_id in ids]
+    after = str(ObjectId())
+
+    response = client.get("/products/", params={"limit": 2, "after": after})
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == str(ids[-1])
+    assert product_listing.filter["_id"] == {"$gt": ObjectId(after)}
+
+    # A short page is the last one, so no cursor is offered
+    response = client.get("/products/", params={"limit": 3, "after": str(ids[-1])})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_products_invalid_cursor(product_listing):
+    """Test that a malformed `after` cursor is rejected with 400."""
+    response = client.get("/products/", params={"after": "not-an-id"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def _counting_keepa_provider(monkeypatch):
+    """Keepa provider whose lookups return real-looking data and count the calls made."""
+    provider = KeepaAPIProvider()
+    calls = []
+
+    async def fetch(search_term):
+        calls.append(search_term)
+        await asyncio.sleep(0.01)
+        return {"keepa_status": "real_data", "search_term": search_term}
+
+    monkeypatch.setattr(provider, "_fetch_keepa_data", fetch)
+    return provider, calls
+
+
+def test_keepa_single_flight(monkeypatch):
+    """Test that concurrent lookups of one term share a single Keepa call."""
+    provider, calls = _counting_keepa_provider(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(*(provider._call_keepa_api("usb cable") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == ["usb cable"]
+    assert all(result["search_term"] == "usb cable" for result in results)
+    # Each caller gets its own copy of the shared result
+    assert len({id(result) for result in results}) == 5
+
+
+def test_keepa_cache_ttl(monkeypatch):
+    """Test that cached Keepa results are reused until they are older than the TTL."""
+    provider, calls = _counting_keepa_provider(monkeypatch)
+
+    async def run():
+        await provider._call_keepa_api("usb cable")
+        await provider._call_keepa_api("usb cable")
+        assert calls == ["usb cable"]
+
+        cached_at, result = provider._result_cache["usb cable"]
+        provider._result_cache["usb cable"] = (cached_at - KEEPA_RESULT_CACHE_TTL_SECONDS, result)
+        await provider._call_keepa_api("usb cable")
+        assert calls == ["usb cable", "usb cable"]
+
+    asyncio.run(run())
+
+
+def _enrichment_service(monkeypatch, rows):
+    """Enrichment service over a mocked database and a CSV catalog file of `rows` names."""
+    csv_data = ("name,price\n" + "".join(f"{name},1.00\n" for name in rows)).encode()
+    monkeypatch.setattr(
+        "app.services.aws_service.aws_service.download_file_from_s3",
+        AsyncMock(return_value=io.BytesIO(csv_data))
+    )
+    service = LocalEnrichmentService()
+    db = MagicMock()
+    db.catalogs.find_one = AsyncMock(return_value={"_id": ObjectId(), "file_path": "catalog.csv", "file_name": "catalog.csv"})
+    db.catalogs.update_one = AsyncMock()
+    db.catalogs.with_options.return_value.update_one = AsyncMock()
+    db.products.insert_many = AsyncMock()
+    service._db = db
+
+    async def enrich_item(item_data):
+        status = "failed" if item_data["name"].startswith("bad") else "completed"
+        return {"enrichment_source": "amazon_api", "enrichment_status": status, "enriched_data": {}, "enriched_at": None}
+
+    monkeypatch.setattr(service.providers["amazon"], "enrich_item", enrich_item)
+    return service
+
+
+def test_enrichment_pipeline_counts(monkeypatch):
+    """Test that the pipeline reports final counts and writes one product per row."""
+    rows = [f"item {i}" for i in range(150)] + ["bad 1", "bad 2"]
+    service = _enrichment_service(monkeypatch, rows)
+
+    result = asyncio.run(service.enrich_catalog(str(ObjectId()), str(ObjectId()), "amazon"))
+    assert result["total_items"] == 152
+    assert result["enriched_items"] == 150
+    assert result["failed_items"] == 2
+    assert result["status"] == "partially_completed"
+
+    inserted = [product for call in service.db.products.insert_many.await_args_list for product in call.args[0]]
+    assert sorted(product["line_item_id"] for product in inserted) == sorted(f"item_{i}" for i in range(152))
+    final_update = service.db.catalogs.update_one.await_args.args[1]["$set"]
+    assert final_update["status"] == "partially_completed"
+    assert final_update["enriched_items"] == 150
+
+
+def test_enrichment_pipeline_failure(monkeypatch):
+    """Test that a failing stage stops the pipeline and marks the catalog as errored."""
+    service = _enrichment_service(monkeypatch, [f"item {i}" for i in range(10)])
+    monkeypatch.setattr(service, "_insert_products", AsyncMock(side_effect=RuntimeError("insert failed")))
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        asyncio.run(service.enrich_catalog(str(ObjectId()), str(ObjectId()), "amazon"))
+    assert [str(e) for e in excinfo.value.exceptions] == ["insert failed"]
+    assert service.db.catalogs.update_one.await_args.args[1]["$set"]["status"] == "error"